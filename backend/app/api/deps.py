@@ -6,10 +6,15 @@ This includes:
 1. Extracting the authenticated user's ID (or mock ID) for service scoping.
 2. Providing singleton instances of core services (e.g., FirestoreService).
 """
+import time
 from typing import Generator, Optional
 from fastapi import Header, HTTPException, status
 from functools import lru_cache
+from redis.asyncio import Redis
 
+from ..core.config import get_settings
+from ..core.security import decode_access_token
+from ..core.cache import get_redis_client
 from ..services.firestore_service import get_firestore_service, FirestoreService
 from ..services.ml_prediction_service import get_ml_prediction_service, MLPredictionService
 from ..services.influencer_service import get_influencer_service, InfluencerService
@@ -19,24 +24,43 @@ from ..services.data_ingestion_service import get_data_ingestion_service, DataIn
 
 # --- User Authentication Dependency ---
 
-# NOTE: this dependency simulates extracting the validated user ID from the authentication layer
-# Later: involve JWT or Firebase token verification
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials or user ID.",
+    )
 
-def get_current_user_id() -> str:
+
+async def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
     """
-    Dependency that returns the authenticated user's ID from the FirestoreService.
+    Dependency that returns the authenticated user's ID from the 'Authorization: Bearer <JWT>' header.
     This ID is used to scope private data access (e.g., user alerts).
+    Declared via Depends(), so FastAPI resolves it once per request and a failure
+    short-circuits every dependent (FastAPI >= 0.68 caches dependency errors); the
+    decode result is additionally cached across requests (see decode_access_token).
     """
-    db_service = get_firestore_service()
-    user_id = db_service.current_user_id
-
+    settings = get_settings()
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        # Without a configured secret no token can be trusted, so the bearer path is disabled
+        if scheme.lower() != "bearer" or not token or not settings.AUTH_SECRET_KEY:
+            raise _credentials_exception()
+        # Valid tokens are cached by decode_access_token until they expire
+        user_id, expires_at = decode_access_token(token)
+        if not user_id or (expires_at is not None and expires_at < time.time()):
+            raise _credentials_exception()
+        return user_id
+
+    # NOTE: no auth layer in front of the API yet (development); when explicitly enabled
+    # (ALLOW_MOCK_USER), fall back to the mock identity the FirestoreService was initialized with.
+    # Later: remove the fallback (Firebase token verification)
+    if not settings.ALLOW_MOCK_USER:
+        raise _credentials_exception()
+    user_id = get_firestore_service().current_user_id
     if not user_id:
         # This should ideally never happen if the service is initialized correctly
         # with an auth token, but acts as a security fallback.
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials or user ID.",
-        )
+        raise _credentials_exception()
     return user_id
 
 
@@ -47,6 +71,11 @@ def get_db() -> FirestoreService:
     return get_firestore_service()
 
 
+def get_redis() -> Optional[Redis]:
+    """Provides the shared Redis client (None when caching is disabled)."""
+    return get_redis_client()
+
+
 def get_ml_service() -> MLPredictionService:
     """Provides a cached instance of the ML Prediction Service."""
     return get_ml_prediction_service()
@@ -5,6 +5,7 @@ Aggregates all individual route modules (influencers, search, alerts, prediction
 into a single, consolidated FastAPI APIRouter for version 1 of the API.
 """
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 # Import the modular route files
 from .routes import predictions
@@ -12,9 +13,15 @@ from .routes import influencers
 from .routes import search
 from .routes import alerts
 
-api_router = APIRouter()
+# orjson-backed responses for every v1 endpoint returning plain dicts
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include all modular routers here
+# NOTE: Starlette matches routes with a linear scan, which is negligible at the current
+# route count. Keep this router flat (each sub-router mounted once, no nested
+# include_router chains, no per-route middleware).
+# Later: if the v1 surface grows past ~50 routes, split it into starlette Mounts
+# with per-path method->handler dispatch.
 api_router.include_router(predictions.router, prefix="", tags=["Predictions & Data Ingestion"])
 api_router.include_router(influencers.router, prefix="", tags=["Influencer Profiles"])
 api_router.include_router(search.router, prefix="", tags=["Search & Filter"])
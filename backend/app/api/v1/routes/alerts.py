@@ -6,12 +6,16 @@ Defines endpoints for users to create, view, and manage their monitoring alerts.
 - GET /alerts: Lists all active alert rules.
 - DELETE /alerts/{alert_id}: Deletes a specific alert rule.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
+from functools import lru_cache
+from collections import defaultdict
+from itertools import count
 
 from ....services.alert_service import AlertService
 from ....api import deps
+from ....utils.helpers import compute_etag, etag_matches
 
 router = APIRouter()
 
@@ -39,26 +43,48 @@ class AlertListResponse(BaseModel):
 
 # --- Dependencies Mock ---
 
-def get_alerts_service() -> AlertService:
-    # NOTE: Mocking the AlertService dependency
-    class MockAlertService:
-        mock_alerts = {}
-
-        async def create_alert(self, user_id: str, rule_data: dict) -> str:
-            new_id = f"alert-{len(self.mock_alerts) + 1}"
-            rule_data['alert_id'] = new_id
-            self.mock_alerts[new_id] = AlertRule(**rule_data)
-            return new_id
-
-        async def list_alerts(self, user_id: str) -> List[dict]:
-            return [a.model_dump() for a in self.mock_alerts.values()]
-
-        async def delete_alert(self, user_id: str, alert_id: str) -> bool:
-            if alert_id in self.mock_alerts:
-                del self.mock_alerts[alert_id]
-                return True
+class MockAlertService:
+    """In-memory stand-in for the AlertService (NOTE: mocking the dependency for now)."""
+
+    def __init__(self):
+        # Alerts are partitioned per user: user_id -> {alert_id -> AlertRule}
+        self.alerts_by_user: Dict[str, Dict[str, AlertRule]] = defaultdict(dict)
+        # ETag of each user's alert list, recomputed on every write
+        self.etags_by_user: Dict[str, str] = {}
+        self._id_counter = count(1)
+
+    def _refresh_etag(self, user_id: str):
+        self.etags_by_user[user_id] = compute_etag(
+            [a.model_dump() for a in self.alerts_by_user[user_id].values()]
+        )
+
+    async def create_alert(self, user_id: str, rule: AlertRule) -> str:
+        # The rule was validated by the route; store the model itself rather than a dict copy
+        new_id = f"alert-{next(self._id_counter)}"
+        rule.alert_id = new_id
+        self.alerts_by_user[user_id][new_id] = rule
+        self._refresh_etag(user_id)
+        return new_id
+
+    async def list_alerts(self, user_id: str) -> List[dict]:
+        return [a.model_dump() for a in self.alerts_by_user[user_id].values()]
+
+    async def get_alerts_etag(self, user_id: str) -> str:
+        if user_id not in self.etags_by_user:
+            self._refresh_etag(user_id)
+        return self.etags_by_user[user_id]
+
+    async def delete_alert(self, user_id: str, alert_id: str) -> bool:
+        # Only alerts owned by the requesting user can be deleted
+        if self.alerts_by_user[user_id].pop(alert_id, None) is None:
             return False
+        self._refresh_etag(user_id)
+        return True
 
+
+@lru_cache(maxsize=1)
+def get_alerts_service() -> AlertService:
+    """Provides a single, cached mock service instance reused across requests."""
     return MockAlertService()  # type: ignore
 
 
@@ -74,8 +100,7 @@ async def create_alert_rule(
     Creates a new monitoring alert rule for a specific influencer and metric.
     """
     try:
-        alert_id = await svc.create_alert(user_id, rule.model_dump(exclude_none=True))
-        rule.alert_id = alert_id
+        await svc.create_alert(user_id, rule)  # assigns rule.alert_id
         return rule
     except Exception as e:
         raise HTTPException(
@@ -84,17 +109,27 @@ async def create_alert_rule(
         )
 
 
-@router.get("/alerts", response_model=AlertListResponse, status_code=status.HTTP_200_OK)
+@router.get("/alerts", response_model=None, responses={200: {"model": AlertListResponse}},
+            status_code=status.HTTP_200_OK)
 async def list_user_alerts(
         svc: AlertService = Depends(get_alerts_service),  # mock
-        user_id: str = Depends(deps.get_current_user_id)
+        user_id: str = Depends(deps.get_current_user_id),
+        if_none_match: Optional[str] = Header(None)
 ):
     """
     Retrieves all active and inactive alert rules configured by the current user.
+    Returns 304 Not Modified when the client's If-None-Match matches the current ETag.
     """
+    etag = await svc.get_alerts_etag(user_id)
+    headers = {"ETag": f'"{etag}"'}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     alerts_data = await svc.list_alerts(user_id)
-    alerts = [AlertRule(**data) for data in alerts_data]
-    return AlertListResponse(alerts=alerts)
+    # The rules come from our own service (validated on create), so skip re-validation
+    # with model_construct and serialize the whole list once
+    response = AlertListResponse.model_construct(alerts=[AlertRule.model_construct(**d) for d in alerts_data])
+    return Response(content=response.model_dump_json(), media_type="application/json", headers=headers)
 
 
 @router.delete("/alerts/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
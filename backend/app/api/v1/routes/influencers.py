@@ -5,12 +5,13 @@ Defines endpoints for retrieving and managing individual influencer profiles.
 - GET /influencers/{influencer_id}: Retrieves a full profile.
 - PUT /influencers/{influencer_id}: Updates a profile (e.g., manual corrections).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
 from ....services.influencer_service import InfluencerService
 from ....api import deps
+from ....utils.helpers import etag_matches
 
 router = APIRouter()
 
@@ -25,7 +26,7 @@ class InfluencerProfile(BaseModel):
     follower_count: int
     engagement_rate: float
     market_score: float
-    last_updated: str = Field(..., description="Timestamp of the last data sync.")
+    last_updated: int = Field(..., description="Timestamp of the last data sync (integer nanoseconds since the epoch).")
 
 class ProfileUpdate(BaseModel):
     """Schema for updating specific fields in a profile."""
@@ -49,11 +50,11 @@ def get_influencer_service_mock() -> InfluencerService:
                     follower_count=500000,
                     engagement_rate=4.5,
                     market_score=85.2,
-                    last_updated="2024-10-27T10:00:00Z"
+                    last_updated=1730023200_000_000_000  # 2024-10-27T10:00:00Z
                 ).model_dump()
             return None
 
-        async def update_profile(self, influencer_id: str, user_id: str, update_data: dict) -> bool:
+        async def update_profile(self, influencer_id: str, user_id: str, update: ProfileUpdate) -> bool:
             return True # Mock success
 
     return MockInfluencerService()
@@ -61,15 +62,18 @@ def get_influencer_service_mock() -> InfluencerService:
 
 # --- Endpoints ---
 
-@router.get("/influencers/{influencer_id}", response_model=InfluencerProfile, status_code=status.HTTP_200_OK)
+@router.get("/influencers/{influencer_id}", response_model=None, responses={200: {"model": InfluencerProfile}},
+            status_code=status.HTTP_200_OK)
 async def get_influencer_profile(
     influencer_id: str,
     # Using the dependency from deps.py now (get_influencer_svc was defined there)
     svc: InfluencerService = Depends(deps.get_influencer_svc),
-    user_id: str = Depends(deps.get_current_user_id)
+    user_id: str = Depends(deps.get_current_user_id),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Retrieves the detailed profile and metrics for a single influencer.
+    Returns 304 Not Modified when the client's If-None-Match matches the stored ETag.
     """
     profile_data = await svc.get_profile(influencer_id, user_id)
 
@@ -79,7 +83,14 @@ async def get_influencer_profile(
             detail=f"Influencer profile '{influencer_id}' not found."
         )
 
-    return InfluencerProfile(**profile_data)
+    etag = profile_data.get('etag')
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": f'"{etag}"'})
+
+    # Serialize once via Pydantic instead of re-validating against a response_model
+    headers = {"ETag": f'"{etag}"'} if etag else None
+    return Response(content=InfluencerProfile(**profile_data).model_dump_json(), media_type="application/json",
+                    headers=headers)
 
 @router.put("/influencers/{influencer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_influencer_profile(
@@ -92,7 +103,7 @@ async def update_influencer_profile(
     Updates specific, mutable fields (like niche tags or manual notes) on an influencer profile.
     """
     try:
-        success = await svc.update_profile(influencer_id, user_id, update.model_dump(exclude_unset=True))
+        success = await svc.update_profile(influencer_id, user_id, update)
         if not success:
              raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -5,11 +5,12 @@ Defines endpoints for querying, searching, and filtering the influencer database
 - GET /search/influencers: Primary endpoint for dynamic search queries.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 # Relying on InfluencerService for search logic
-from ....services.influencer_service import InfluencerService
+from ....services.influencer_service import InfluencerService, SearchFilters
 from ....api import deps
 # Import the InfluencerProfile schema for search results
 from .influencers import InfluencerProfile
@@ -25,9 +26,23 @@ class SearchResult(BaseModel):
     page: int
     results: List[InfluencerProfile] = Field(default_factory=list, description="The list of profiles for the current page.")
 
+# --- Helpers ---
+
+def _stream_search_result(profiles: List[InfluencerProfile], total: int,
+                          page_size: int, page: int) -> Iterator[bytes]:
+    """Yields a SearchResult JSON document in chunks, serializing one profile per chunk."""
+    yield f'{{"count":{total},"page_size":{page_size},"page":{page},"results":['.encode()
+    for i, profile in enumerate(profiles):
+        yield (b',' if i else b'') + profile.model_dump_json().encode()
+    yield b']}'
+
+
 # --- Endpoints ---
 
-@router.get("/search/influencers", response_model=SearchResult, status_code=status.HTTP_200_OK)
+# The response is streamed (one serialized profile per chunk) instead of being
+# validated against a response_model; `responses` keeps the OpenAPI schema.
+@router.get("/search/influencers", response_model=None, responses={200: {"model": SearchResult}},
+            status_code=status.HTTP_200_OK)
 async def search_influencers(
     q: Optional[str] = Query(None, description="Free text search query (e.g., username, bio keywords)."),
     niche: Optional[str] = Query(None, description="Filter by primary niche tag (e.g., 'Gaming', 'Fitness')."),
@@ -42,41 +57,33 @@ async def search_influencers(
     """
     Performs a dynamic search and filter query across the influencer database.
     Supports text search, niche filtering, and metric thresholds (followers, score).
+    The SearchResult body is streamed profile by profile; the total is also sent as X-Total-Count.
     """
-    # Map API query parameters to Service method parameters
-    search_params = {
-        # Note: The underlying service handles free-text (q) filtering in-memory
-        "q": q,
-        "niche": niche,
-        "min_engagement_rate": min_engagement,
-        "min_followers": min_followers,
-        # Pagination is handled by the service using limit/offset
-        "limit": limit,
-        "page": page
-    }
+    # The service pushes free-text (q) and metric filters down to Firestore
+    search = SearchFilters(
+        q=q,
+        niche=niche,
+        min_engagement_rate=min_engagement,
+        min_followers=min_followers,
+        limit=limit,
+        page=page
+    )
 
     try:
-        # The service returns the final, sorted, and paginated list
-        all_results = await svc.search_and_filter_influencers(search_params)
-
-        # Since the service returns the full list (sorted and limited),
-        # we can mock a total count for demonstration purposes.
-        # Later: return the total count before pagination.
-        total_mock_count = len(all_results) * 2 # Mocking a larger total
-
-        # Apply in-memory pagination to match the simple service implementation
-        start_index = (page - 1) * limit
-        paginated_results = all_results[start_index:start_index + limit]
-
-        return SearchResult(
-            count=total_mock_count,
-            page_size=limit,
-            page=page,
-            results=paginated_results
-        )
-
+        # The count aggregation and the ranked page are fetched (concurrently) and validated
+        # before the first byte is sent, so a failure is still reported as a 500, not a truncated 200
+        search_result = await svc.search_and_filter_influencers(search)
+        total = search_result["total"]
+        profiles = [InfluencerProfile.model_validate(profile) for profile in search_result["results"]]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Search operation failed: {e.__class__.__name__}"
-        )
\ No newline at end of file
+        )
+
+
+    return StreamingResponse(
+        _stream_search_result(profiles, total, page_size=limit, page=page),
+        media_type="application/json",
+        headers={"X-Total-Count": str(total)}
+    )
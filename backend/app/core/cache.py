@@ -0,0 +1,28 @@
+"""
+cache.py
+--------
+Provides the shared Redis client used as a read-through cache for hot,
+slowly-changing API reads (e.g., influencer profiles).
+"""
+from typing import Optional
+from functools import lru_cache
+from redis.asyncio import Redis
+
+from .config import get_settings
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_redis_client() -> Optional[Redis]:
+    """
+    Provides a cached singleton Redis client (one connection pool per process).
+    Returns None when REDIS_URL is not configured, which disables caching.
+    """
+    redis_url = get_settings().REDIS_URL
+    if not redis_url:
+        logger.warning("REDIS_URL not set. Response caching is disabled.")
+        return None
+    # Raw bytes in/out: cached values are orjson-encoded by the services
+    return Redis.from_url(redis_url, decode_responses=False)
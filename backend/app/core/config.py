@@ -25,8 +25,15 @@ class Settings(BaseSettings):
 
     # --- Firebase/Authentication Settings ---
     FIREBASE_PROJECT_ID: Optional[str] = None
-    # JWT secret is typically handled by Firebase Admin SDK, but included for structure
-    #AUTH_SECRET_KEY: str = ""
+    # JWT secret is typically handled by Firebase Admin SDK, but included for structure.
+    # Bearer tokens are rejected while it is empty (an empty HS256 key would accept forged tokens)
+    AUTH_SECRET_KEY: str = ""
+    # Development only: requests without an Authorization header act as the
+    # FirestoreService's mock identity instead of being rejected
+    ALLOW_MOCK_USER: bool = False
+
+    # --- Cache Settings ---
+    REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0; caching is disabled when unset
 
     # --- ML/Model Settings ---
     # Path where model artifacts are expected to be mounted in the container
@@ -34,6 +41,9 @@ class Settings(BaseSettings):
 
     # --- Service/API Limits ---
     DEFAULT_SEARCH_LIMIT: int = 25  # Default number of results for influencer searches
+    # False: searches filter a cached, columnar snapshot of all profiles in memory instead of
+    # querying Firestore (small datasets, or an emulator without the composite indexes)
+    SEARCH_SERVER_SIDE: bool = True
     MAX_API_WORKERS: int = 4  # Limits the concurrency of expensive ML prediction calls
 
     # --- Alert Management ---
@@ -6,8 +6,10 @@ the standard Python 'logging' module. Ensures consistent, structured output
 for debugging and production monitoring.
 """
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Define standard logging format for structured output
 LOGGING_FORMAT = (
@@ -16,13 +18,20 @@ LOGGING_FORMAT = (
     "%(message)s"
 )
 
+# Background listener that performs the actual (blocking) stream writes
+_queue_listener: Optional[logging.handlers.QueueListener] = None
 
-def configure_logging(log_level: str = "INFO"):
+
+def configure_logging(log_level: str = "INFO", access_log_level: str = "WARNING"):
     """
     Sets up the root logger configuration for the entire application.
+    Records are put on an in-memory queue (QueueHandler) and written to stderr by a
+    QueueListener thread, so emitting a log never blocks the event loop on I/O.
     Args:
         log_level: The minimum level to log (e.g., 'DEBUG', 'INFO', 'WARNING').
+        access_log_level: Level for uvicorn's per-request access log ('WARNING' silences it).
     """
+    global _queue_listener
 
     # Root Logger Configuration
     root_logger = logging.getLogger()
@@ -39,10 +48,24 @@ def configure_logging(log_level: str = "INFO"):
         formatter = logging.Formatter(LOGGING_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
         handler.setFormatter(formatter)
 
-        # Add the handler to the root logger
-        root_logger.addHandler(handler)
+        # The root logger only enqueues; the listener thread writes through the stream handler
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _queue_listener.start()
+
+    # Per-request access logging is a throughput cost; only warnings and errors by default
+    logging.getLogger("uvicorn.access").setLevel(access_log_level.upper())
+
+    root_logger.info("Logging configured at level: %s", log_level.upper())
+
 
-    print(f"INFO: Logging configured at level: {log_level.upper()}")
+def shutdown_logging():
+    """Stops the queue listener, flushing any records still queued."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
 
 
 # Add a helper to quickly get a service logger
@@ -5,10 +5,12 @@ Defines security constants, configurations, and utility functions such as
 password hashing and verification, primarily used during user authentication
 and authorization processes.
 """
+import time
+from cachetools import TLRUCache
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional, Any
-from jose import jwt
+from typing import Optional, Any, Dict, Tuple
+from jose import JWTError, jwt
 
 # Password hashing context (using bcrypt as the default standard)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -21,6 +23,20 @@ settings = get_settings()
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 # Token expiration time
+# Upper bound on how long a verified token is reused without running jwt.decode again
+DECODED_TOKEN_CACHE_SECONDS = 300
+
+
+def _decoded_token_ttu(_token: str, decoded: Tuple[str, Optional[float]], now: float) -> float:
+    """Cached decodes expire with their token (or after DECODED_TOKEN_CACHE_SECONDS, whichever is first)."""
+    _, expires_at = decoded
+    if expires_at is None:
+        return now + DECODED_TOKEN_CACHE_SECONDS
+    return min(expires_at, now + DECODED_TOKEN_CACHE_SECONDS)
+
+
+# Raw token -> (subject, expiry) of successfully verified tokens only
+_decoded_tokens: TLRUCache = TLRUCache(maxsize=1024, ttu=_decoded_token_ttu, timer=time.time)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -46,4 +62,28 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
     to_encode.update({"exp": expire, "sub": "access_token"})
     encoded_jwt = jwt.encode(to_encode, settings.AUTH_SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+def decode_access_token(token: str) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Verifies a JWT and returns its subject and expiry timestamp, or (None, None) if it is invalid.
+    Successful decodes are cached on the raw token string until the token expires, so
+    repeated requests with the same token skip signature verification. Invalid tokens
+    are never cached (a flood of them cannot evict valid ones).
+    """
+    decoded = _decoded_tokens.get(token)
+    if decoded is not None:
+        # The expiry is re-checked on every hit, not only when the entry is evicted
+        if decoded[1] is not None and decoded[1] < time.time():
+            return None, None
+        return decoded
+
+    try:
+        payload = jwt.decode(token, settings.AUTH_SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None, None
+    subject, expires_at = payload.get("sub"), payload.get("exp")
+    if subject:
+        _decoded_tokens[token] = (subject, expires_at)
+    return subject, expires_at
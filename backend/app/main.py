@@ -10,15 +10,20 @@ from typing import Dict, Any
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .core.config import get_settings
-from .core.logging_config import configure_logging
+from .core.logging_config import configure_logging, get_logger, shutdown_logging
 from .api.v1.router import api_router
 from .services.firestore_service import get_firestore_service  # Ensure DB is initialized early
 from .services.scheduler import get_scheduler, BackgroundScheduler  # For background tasks
+from .services.ml_prediction_service import get_ml_prediction_service, create_inference_executor
+from .services.data_ingestion_service import get_data_ingestion_service
+from .ml_agents._registry import get_shared_agents
 
 # Load settings immediately
 settings = get_settings()
+logger = get_logger(__name__)
 
 
 @asynccontextmanager
@@ -27,29 +32,54 @@ async def lifespan(app: FastAPI):
     Application startup and shutdown events.
     Handles configuration, service initialization, and cleanup.
     """
-    print("--- APPLICATION STARTUP ---")
-
     # Configure Logging
     configure_logging(log_level="INFO")
+    logger.info("--- APPLICATION STARTUP ---")
 
     # Initialize Core Services (Ensures singletons are created)
     db_service = get_firestore_service()
-    print(f"INFO: Firestore Service initialized for user: {db_service.current_user_id}")
+    logger.info("Firestore Service initialized for user: %s", db_service.current_user_id)
+
+    # Load the ML agents once for this process (the services share them)
+    get_shared_agents()
+
+    # Process pool for CPU-bound ML inference (keeps the event loop free during model calls);
+    # its workers are not forked from this process and load only the EngagementAgent
+    inference_executor = create_inference_executor(settings.MAX_API_WORKERS)
+    get_ml_prediction_service().executor = inference_executor
+    logger.info("ML inference pool started with %d workers", settings.MAX_API_WORKERS)
+
+    # Coalesce concurrent /data-ingestion profile writes into batched commits
+    ingestion_service = get_data_ingestion_service()
+    ingestion_service.start_write_batcher()
+    # Audit logs are buffered and written in the background (off the ingestion request path)
+    ingestion_service.start_audit_log_flusher()
 
     # Start Background Scheduler for Alerts
     scheduler: BackgroundScheduler = get_scheduler()
     scheduler.start()
 
-    print("--- STARTUP COMPLETE ---")
+    logger.info("--- STARTUP COMPLETE ---")
     yield
 
     # --- SHUTDOWN ---
-    print("--- APPLICATION SHUTDOWN ---")
+    logger.info("--- APPLICATION SHUTDOWN ---")
 
     # Stop Background Scheduler gracefully
-    scheduler.shutdown()
+    await scheduler.shutdown()
 
-    print("--- SHUTDOWN COMPLETE ---")
+    # Flush any queued ingestion writes and buffered audit logs
+    await ingestion_service.stop_write_batcher()
+    await ingestion_service.stop_audit_log_flusher()
+
+    # Detach and stop the inference pool
+    get_ml_prediction_service().executor = None
+    inference_executor.shutdown(wait=True, cancel_futures=True)
+
+    logger.info("--- SHUTDOWN COMPLETE ---")
+
+    # Flush queued log records last
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -69,6 +99,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads (e.g., search results, alert lists); small bodies are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # --- API ROUTERS ---
 # Include the aggregated v1 API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
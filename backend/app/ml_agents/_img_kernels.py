@@ -0,0 +1,57 @@
+"""
+_img_kernels.py
+---------------
+Numba-compiled pixel kernels used by the ContentVisualAgent.
+Each kernel makes a single pass over the raw uint8 pixels (no float copy of the image).
+"""
+import math
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+except ImportError:  # numba not installed: fall back to numpy reductions
+    njit = None
+
+# uint8 -> [0, 1] float32 lookup table: one gather per pixel instead of a cast plus a divide
+_U8_TO_F32 = np.arange(256, dtype=np.float32) / 255.0
+
+
+def normalize_u8(img: np.ndarray) -> np.ndarray:
+    """Returns the uint8 image as float32 in [0, 1] (single pass via the lookup table)."""
+    return _U8_TO_F32[img]
+
+
+def _mean_std_u8_numpy(img: np.ndarray) -> Tuple[float, float]:
+    """Numpy fallback for mean_std_u8 (normalized through the lookup table)."""
+    image_float = normalize_u8(img)
+    return float(image_float.mean()), float(image_float.std())
+
+
+if njit is not None:
+    # Serial on purpose: the kernel is called concurrently from thread pools, which Numba's
+    # default (workqueue) threading layer does not support for parallel kernels; images are small anyway
+    @njit(cache=True, fastmath=True)
+    def _mean_std_u8_numba(img):
+        flat = img.ravel()
+        n = flat.size
+        s = 0.0
+        s2 = 0.0
+        for i in range(n):
+            v = float(flat[i])
+            s += v
+            s2 += v * v
+        m = s / n
+        var = s2 / n - m * m
+        return m / 255.0, math.sqrt(max(var, 0.0)) / 255.0
+
+
+def mean_std_u8(img: np.ndarray) -> Tuple[float, float]:
+    """
+    Returns the (mean, std) of a uint8 image, normalized to [0, 1].
+    Fused single pass: sums and squared sums are accumulated in the uint8 domain
+    and scaled once at the end.
+    """
+    if njit is None:
+        return _mean_std_u8_numpy(img)
+    return _mean_std_u8_numba(np.ascontiguousarray(img))
@@ -0,0 +1,19 @@
+"""
+_model_loader.py
+----------------
+Process-wide cache for joblib model artifacts shared by the ML agents.
+"""
+import joblib
+from functools import lru_cache
+from typing import Any, Optional
+
+
+@lru_cache(maxsize=32)
+def load_joblib(path: str, mmap_mode: Optional[str] = 'r') -> Any:
+    """
+    Loads a joblib artifact once per process; later calls with the same path return
+    the same object (agents only read their models, so sharing is safe).
+    With mmap_mode='r', large numpy arrays inside the pickle are memory-mapped,
+    so processes loading the same file share it through the OS page cache.
+    """
+    return joblib.load(path, mmap_mode=mmap_mode)
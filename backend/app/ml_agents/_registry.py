@@ -0,0 +1,38 @@
+"""
+_registry.py
+------------
+Process-wide registry of the ML agents shared by every service.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .niche_profiler_agent import NicheProfilerAgent
+from .content_visual_agent import ContentVisualAgent
+from .engagement_agent import EngagementAgent
+from .recommendation_agent import RecommendationAgent
+
+
+@dataclass(frozen=True)
+class SharedAgents:
+    """The four agents, each loaded once per process."""
+    niche: NicheProfilerAgent
+    visual: ContentVisualAgent
+    engagement: EngagementAgent
+    recommendation: RecommendationAgent
+
+
+@lru_cache(maxsize=1)
+def get_shared_agents() -> SharedAgents:
+    """
+    Loads every agent (and its model artifact) once per process; services reference
+    these instances instead of constructing their own.
+    Called from the app lifespan; inference pool workers do not use the registry
+    (they load only the EngagementAgent, see ml_prediction_service).
+    """
+    print("INFO: Loading shared ML agents...")
+    return SharedAgents(
+        niche=NicheProfilerAgent(),
+        visual=ContentVisualAgent(),
+        engagement=EngagementAgent(),
+        recommendation=RecommendationAgent()
+    )
@@ -1,8 +1,14 @@
 import numpy as np
 import os
-import joblib
-from typing import Dict, Any
-from ..utils.image_utils import mock_image_path_to_array  # Import the utility created above
+import sys
+import xxhash
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple, Union
+from ._model_loader import load_joblib
+from ..utils.image_utils import mock_image_path_to_array, image_bytes_to_array  # Import the utility created above
+from ._img_kernels import mean_std_u8
 
 # Mock imports for CV dependencies
 # import cv2 # OpenCV for image loading/processing
@@ -13,6 +19,75 @@ from ..utils.image_utils import mock_image_path_to_array  # Import the utility c
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 MODEL_DIR = os.path.join(PROJECT_ROOT, 'models')
 
+# Feature names for the deep embedding, built (and interned) once instead of formatted per post
+_CLIP_KEYS = tuple(sys.intern(f'Clip_Feature_{i}') for i in range(128))
+
+# Safe mock features (failure path, video posts), built once; callers get a copy
+_MOCK_TEMPLATE = MappingProxyType({
+    'Image_Aspect_Ratio': 1.0,
+    'Image_Brightness': 0.5,
+    'Image_Contrast': 0.5,
+    'Image_Sharpness_Score': 0.5,
+    'is_video_post': 0,
+    **dict.fromkeys(_CLIP_KEYS, 0.0)
+})
+
+# Process-wide embedding cache switch (see enable_embed_cache)
+_EMBED_CACHE_ENABLED = True
+
+# Image loading is I/O bound (disk/network), so many loader threads overlap with the pixel kernels
+IMAGE_PREFETCH_THREADS = 64
+
+# An image source is either a local path or the encoded image bytes
+ImageSource = Union[str, bytes]
+
+
+def load_image(source: ImageSource) -> np.ndarray:
+    """Loads an image source (local path or encoded bytes) into a uint8 (H, W, 3) array."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return image_bytes_to_array(source)
+    # Image loading via mock utility
+    return mock_image_path_to_array(source)
+
+
+def prefetch_images(sources: List[ImageSource], pool: ThreadPoolExecutor) -> List[Future]:
+    """
+    Submits every image load to the pool up front and returns one Future[np.ndarray]
+    per source, in input order. Consuming the futures in order lets decoding of the
+    next images overlap with feature extraction on the current one.
+    """
+    return [pool.submit(load_image, source) for source in sources]
+
+
+def _deep_embed(img_hash: int, caption_hash: int) -> np.ndarray:
+    """
+    Computes the (mock) deep embedding for an image/caption pair.
+    Returned arrays are read-only because cached instances are shared between callers.
+    """
+    # Mocking the output: a dense, 128-dimensional feature vector, deterministically.
+    # A local PCG64 Generator avoids mutating (and contending on) the global RNG state,
+    # and fills float32 directly instead of casting a float64 array.
+    rng = np.random.default_rng(img_hash & 0xFFFFFFFF)
+    # Deep features are typically normalized
+    embedding = rng.random(len(_CLIP_KEYS), dtype=np.float32)
+    embedding.setflags(write=False)
+    return embedding
+
+
+# Repeated posts (alert re-evaluation, dashboard refreshes) reuse the embedding
+_cached_deep_embed = lru_cache(maxsize=512)(_deep_embed)
+
+
+def enable_embed_cache(enabled: bool = True):
+    """Turns the process-wide embedding cache on or off."""
+    global _EMBED_CACHE_ENABLED
+    _EMBED_CACHE_ENABLED = enabled
+
+
+def clear_embed_cache():
+    """Drops all cached embeddings (e.g., after a model artifact reload)."""
+    _cached_deep_embed.cache_clear()
+
 
 class ContentVisualAgent:
     """
@@ -22,11 +97,13 @@ class ContentVisualAgent:
     # This agent typically uses pre-trained visual models (not joblib), but using joblib
     # to mock the loading of a simple feature extraction pipe/scaler.
     MODEL_FILENAME = 'content_visual_model_artifact.joblib'
-    MOCK_FEATURE_SIZE = 128  # The size of the simulated CLIP/CNN embedding vector
+    MOCK_FEATURE_SIZE = len(_CLIP_KEYS)  # The size of the simulated CLIP/CNN embedding vector
 
     def __init__(self):
         self.model = self._load_model()
         self.is_ready = self.model is not None
+        # Loader threads are started on demand, so the pool is cheap until the first batch
+        self._io_pool = ThreadPoolExecutor(max_workers=IMAGE_PREFETCH_THREADS, thread_name_prefix="image-prefetch")
 
     def _load_model(self) -> Any:
         """Simulates loading a visual pipeline scaler or metadata file."""
@@ -38,7 +115,7 @@ class ContentVisualAgent:
         try:
             # Assuming a mock model file exists here for consistency
             # If not, the agent just runs the feature extraction logic directly on the array
-            model = joblib.load(model_path)
+            model = load_joblib(model_path)
             print(f"SUCCESS: Agent 2 ({self.MODEL_FILENAME}) loaded.")
             return model
         except Exception as e:
@@ -52,78 +129,127 @@ class ContentVisualAgent:
         """
         # Mock calculation of simple features
         height, width, _ = image_array.shape
-        # Convert to float for calculation
-        image_float = image_array.astype(np.float32) / 255.0
-
-        avg_brightness = np.mean(image_float)
-        contrast_score = np.std(image_float)
+        # Fused single-pass mean/std over the raw uint8 pixels (no float copy of the image)
+        avg_brightness, contrast_score = mean_std_u8(image_array)
 
+        # Unrounded: these are model inputs only, and the model rescales them anyway
         return {
             'Image_Aspect_Ratio': width / height,
-            'Image_Brightness': round(avg_brightness, 4),
-            'Image_Contrast': round(contrast_score, 4),
-            'Image_Sharpness_Score': round(0.5 + contrast_score, 4)  # Mock: higher contrast = higher sharpness
+            'Image_Brightness': avg_brightness,
+            'Image_Contrast': contrast_score,
+            'Image_Sharpness_Score': 0.5 + contrast_score  # Mock: higher contrast = higher sharpness
         }
 
+    def _extract_deep_features_per_image(self, images: List[np.ndarray], captions: List[str]) -> np.ndarray:
+        """
+        Runs _extract_deep_features on each image in turn and collects the embeddings into one
+        (N, MOCK_FEATURE_SIZE) float32 array. This is a Python loop, not a vectorized step:
+        each mock embedding is seeded (and cached) by its own image's content hash.
+        Images keep their native sizes (preprocessing resizes them per image).
+        """
+        if self.is_ready:
+            # Placeholder for actual model inference: a real model would replace this loop
+            # with one forward pass for the whole batch, e.g. model(preprocess(images))
+            pass
+
+        embeddings = np.empty((len(images), self.MOCK_FEATURE_SIZE), dtype=np.float32)
+        for row, (image, caption) in enumerate(zip(images, captions)):
+            embeddings[row] = self._extract_deep_features(image, caption)
+        return embeddings
+
     def _extract_deep_features(self, image_array: np.ndarray, caption: str) -> np.ndarray:
         """
         Simulates the output of a high-dimensional model like CLIP (for multimodal) or a CNN (for object classification).
         This provides the dense feature embedding for the PLEP model.
         """
         if self.is_ready:
-            # Placeholder for actual model inference, Preprocessing (e.g., resize using cv2, normalize)
+            # Placeholder for actual model inference, Preprocessing (e.g., resize using cv2, normalize via normalize_u8)
             # CLIP/CNN Model forward pass: model.predict(preprocessed_image)
             pass
 
-        # Mocking the output: a dense, 128-dimensional feature vector, deterministically
-        np.random.seed(hash(image_array.tobytes()) % (2 ** 32 - 1))
-        # Deep features are typically normalized
-        return np.random.rand(self.MOCK_FEATURE_SIZE).astype(np.float32)
+        # Embeddings are cached by (image content, caption) hash.
+        # xxh3 hashes the pixel buffer in place (no tobytes() copy for contiguous arrays)
+        # and, unlike hash(bytes), gives the same seed in every process.
+        pixels = memoryview(image_array) if image_array.flags.c_contiguous else image_array.tobytes()
+        img_hash = xxhash.xxh3_64_intdigest(pixels)
+        caption_hash = hash(caption)
+        embed = _cached_deep_embed if _EMBED_CACHE_ENABLED else _deep_embed
+        return embed(img_hash, caption_hash)
 
-    def extract_features(self, image_path: str, caption: str, is_video: bool = False) -> Dict[str, Any]:
+    def extract_features(self, image_path: Optional[str], caption: str, is_video: bool = False,
+                         image_bytes: Optional[bytes] = None) -> Dict[str, Any]:
         """
-        Extracts visual features from the image/video frame path.
+        Extracts visual features from the image/video frame path, or from the
+        already downloaded image_bytes when given (no filesystem round trip).
         """
-        if is_video:
-            ###### Later: call mock_video_frame_capture
-            return self._extract_mock_features(is_video=True)
+        source = image_bytes if image_bytes is not None else image_path
+        return self.extract_features_batch([(source, caption, is_video)])[0]
 
-        try:
-            # Image loading via mock utility
-            image_array = mock_image_path_to_array(image_path)
+    def extract_features_batch(self, items: List[Tuple[ImageSource, str, bool]]) -> List[Dict[str, Any]]:
+        """
+        Extracts visual features for many posts at once.
 
-            # Low-level features
-            low_level_features = self._extract_low_level_features(image_array)
+        Args:
+            items: (image_path or image_bytes, caption, is_video) per post.
 
-            # Deep features (Embeddings)
-            deep_embedding = self._extract_deep_features(image_array, caption)
+        Returns:
+            One feature dictionary per post, in input order.
+        """
+        results: List[Dict[str, Any]] = [None] * len(items)
+        image_indices = []
+        for idx, (_, _, is_video) in enumerate(items):
+            if is_video:
+                ###### Later: call mock_video_frame_capture
+                results[idx] = self._extract_mock_features(is_video=True)
+            else:
+                image_indices.append(idx)
 
-            # Combine all features
-            feature_dict = low_level_features
-            # Convert the deep embedding array into labeled features (Deep_Feature_0, Deep_Feature_1, ...)
-            for i, val in enumerate(deep_embedding):
-                feature_dict[f'Clip_Feature_{i}'] = float(val)
+        if not image_indices:
+            return results
 
-            feature_dict['is_video_post'] = int(is_video)
-            return feature_dict
+        # Every load is queued before any feature work starts
+        futures = prefetch_images([items[idx][0] for idx in image_indices], self._io_pool)
+        # Low-level features run on each image while the next ones are still loading.
+        # Errors are isolated per post: only the failing post falls back to mock features.
+        loaded_indices = []
+        images = []
+        low_level_features = []
+        for idx, future in zip(image_indices, futures):
+            try:
+                image = future.result()
+                low_level_features.append(self._extract_low_level_features(image))
+            except Exception as e:
+                print(f"Error during ContentVisualAgent feature extraction: {e}")
+                results[idx] = self._extract_mock_features(is_video=False)
+                continue
+            loaded_indices.append(idx)
+            images.append(image)
 
+        if not loaded_indices:
+            return results
+
+        try:
+            # Deep features (Embeddings) for every loaded image, one row per post
+            captions = [items[idx][1] for idx in loaded_indices]
+            deep_embeddings = self._extract_deep_features_per_image(images, captions)
         except Exception as e:
             print(f"Error during ContentVisualAgent feature extraction: {e}")
-            return self._extract_mock_features(is_video=is_video)
+            for idx in loaded_indices:
+                results[idx] = self._extract_mock_features(is_video=False)
+            return results
+
+        for idx, feature_dict, embedding in zip(loaded_indices, low_level_features, deep_embeddings):
+            # Label the deep embedding (Clip_Feature_0, Clip_Feature_1, ...)
+            feature_dict.update(zip(_CLIP_KEYS, embedding.tolist()))
+            feature_dict['is_video_post'] = 0
+            results[idx] = feature_dict
+
+        return results
 
     def _extract_mock_features(self, is_video: bool) -> Dict[str, Any]:
         """Returns safe mock features on failure or for video posts."""
-        feature_dict = {
-            'Image_Aspect_Ratio': 1.0,
-            'Image_Brightness': 0.5,
-            'Image_Contrast': 0.5,
-            'Image_Sharpness_Score': 0.5,
-            'is_video_post': int(is_video)
-        }
-        # Add mock deep features
-        for i in range(self.MOCK_FEATURE_SIZE):
-            feature_dict[f'Clip_Feature_{i}'] = 0.0
-
+        feature_dict = dict(_MOCK_TEMPLATE)
+        feature_dict['is_video_post'] = int(is_video)
         return feature_dict
 
     def predict(self, input_features: Dict[str, Any]) -> Any:
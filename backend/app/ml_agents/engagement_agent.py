@@ -1,8 +1,8 @@
 import numpy as np
 import pandas as pd
 import os
-import joblib
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
+from ._model_loader import load_joblib
 
 # Define the absolute path to the project's root directory for model loading
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
@@ -28,18 +28,18 @@ class EngagementAgent:
             print(f"WARNING: Model artifact not found at {model_path}. Agent will run in mock mode.")
             return None
         try:
-            model = joblib.load(model_path)
+            model = load_joblib(model_path)
             print(f"SUCCESS: Agent 3 ({self.MODEL_FILENAME}) loaded.")
             return model
         except Exception as e:
             print(f"ERROR loading model {self.MODEL_FILENAME}: {e}. Running in mock mode.")
             return None
 
-    def _convert_features_to_df(self, features: Dict[str, Any]) -> pd.DataFrame:
-        """Converts the feature dictionary into a format expected by the model."""
+    def _convert_features_to_df(self, features: Union[Dict[str, Any], List[Dict[str, Any]]]) -> pd.DataFrame:
+        """Converts one feature dictionary (or a list of them, one row each) into a format expected by the model."""
         # This function ensures alignment and dtype conversion.
         # Using df, let the model handle missing feature warnings.
-        df = pd.DataFrame([features])
+        df = pd.DataFrame(features if isinstance(features, list) else [features])
         return df.select_dtypes(include=[np.number]) # Only pass numerical data to the model
 
     def _mock_prediction(self, features: Dict[str, Any]) -> float:
@@ -69,12 +69,32 @@ class EngagementAgent:
             print(f"Prediction Error in EngagementAgent: {e}. Falling back to mock prediction.")
             return self._mock_prediction(input_features)
 
-    def get_diagnostics(self, input_features: Dict[str, Any]) -> Dict[str, Any]:
+    def predict_batch(self, features_list: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Predicts the PLEP for many posts with a single model call (one (N, F) frame
+        instead of N predict() calls). Returns the clamped percentages, shape (N,).
+        """
+        if self.is_ready and features_list:
+            try:
+                predictions = self.model.predict(self._convert_features_to_df(features_list))
+                return np.clip(np.asarray(predictions, dtype=np.float64), 0.0, 15.0)
+            except Exception as e:
+                print(f"Prediction Error in EngagementAgent: {e}. Falling back to mock prediction.")
+
+        return np.fromiter(
+            (self._mock_prediction(features) for features in features_list),
+            dtype=np.float64,
+            count=len(features_list)
+        )
+
+    def get_diagnostics(self, input_features: Dict[str, Any], plep_score: Optional[float] = None) -> Dict[str, Any]:
         """
         Provides diagnostic insights by analyzing feature importance for the PLEP prediction.
         Crucial for the potential Creator/Influencer Dashboard (Feature Importance Scoring).
+        Pass plep_score when the prediction is already known to skip re-running the model.
         """
-        plep_score = self.predict(input_features)
+        if plep_score is None:
+            plep_score = self.predict(input_features)
 
         ###### Later: access self.model.feature_importances_ or SHAP/LIME.
         # Mock the top contributing features based on input values.
@@ -1,4 +1,5 @@
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 from .niche_profiler_agent import NicheProfilerAgent
 from .content_visual_agent import ContentVisualAgent
@@ -15,6 +16,9 @@ class FeatureOrchestrator:
         """Initializes the orchestrator with instances of the feature agents."""
         self.niche_agent = niche_agent
         self.visual_agent = visual_agent
+        # The text and visual agents share no state, so they run side by side
+        # (numpy and the loaded sklearn/C models release the GIL)
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="feature-agent")
         print("FeatureOrchestrator initialized with Agent 1 and Agent 2 instances.")
 
     def create_post_feature_vector(
@@ -28,7 +32,8 @@ class FeatureOrchestrator:
         Generates the full feature vector for a single post prediction (PLEP).
 
         Args:
-            influencer_features: Aggregated, historical features of the influencer (e.g., follower count, growth rate).
+            influencer_features: Aggregated, historical numeric features of the influencer
+                                 (e.g., follower count, growth rate).
             caption: The text content of the post.
             image_path: Local path to the image/frame file.
             is_video: Flag indicating if the post is a video.
@@ -36,24 +41,80 @@ class FeatureOrchestrator:
         Returns:
             A single dictionary containing all required features for Agent 3 (PLEP).
         """
-        # Extract Text/Niche Features (Agent 1)
-        text_features = self.niche_agent.extract_features(caption)
+        # Extract Visual Features (Agent 2; all numeric) on a worker thread while
+        # Text/Niche Features (Agent 1) are extracted; the categorical Niche_Label is split off
+        visual_future = self._pool.submit(self.visual_agent.extract_features, image_path, caption, is_video)
+        text_future = self._pool.submit(self.niche_agent.extract_feature_parts, caption)
+        text_features, _ = text_future.result()
+        visual_features = visual_future.result()
 
-        # Extract Visual Features (Agent 2)
-        visual_features = self.visual_agent.extract_features(image_path, caption, is_video)
+        # Combine Features: historical features first, then the real-time features.
+        # Every part is already numeric, so no per-key type filtering is needed.
+        full_feature_vector = {**influencer_features, **text_features, **visual_features}
+        full_feature_vector.pop('Niche_Label', None)
+        return full_feature_vector
 
-        # Combine Features
-        # Start with the influencer's historical features
-        full_feature_vector = influencer_features.copy()
+    def create_post_feature_vectors(
+            self,
+            influencer_features: Dict[str, Any],
+            posts: List[Tuple[str, str, bool]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched version of create_post_feature_vector for many posts of one influencer.
+        Visual features are extracted in a single batch call to Agent 2.
+
+        Args:
+            influencer_features: Aggregated, historical numeric features of the influencer.
+            posts: (caption, image_path, is_video) per post.
 
-        # Merge real-time features
-        full_feature_vector.update(text_features)
-        full_feature_vector.update(visual_features)
+        Returns:
+            One numerical feature dictionary per post, in input order.
+        """
+        return self.create_post_feature_vector_batch([influencer_features] * len(posts), posts)
 
-        # Remove non-numerical features before passing to Agent 3
-        numerical_vector = {k: v for k, v in full_feature_vector.items() if isinstance(v, (int, float, np.number))}
+    def create_post_feature_vector_batch(
+            self,
+            influencer_features_list: List[Dict[str, Any]],
+            posts: List[Tuple[str, str, bool]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched version of create_post_feature_vector for posts of (possibly) different influencers.
+        Visual features are extracted in a single batch call to Agent 2.
 
-        return numerical_vector
+        Args:
+            influencer_features_list: Aggregated, historical numeric features of each post's influencer.
+            posts: (caption, image_path, is_video) per post.
+
+        Returns:
+            One numerical feature dictionary per post, in input order.
+        """
+        visual_batch = self.visual_agent.extract_features_batch(
+            [(image_path, caption, is_video) for caption, image_path, is_video in posts]
+        )
+
+        vectors = []
+        for influencer_features, (caption, _, _), visual_features in zip(influencer_features_list, posts, visual_batch):
+            text_features, _ = self.niche_agent.extract_feature_parts(caption)
+            full_feature_vector = {**influencer_features, **text_features, **visual_features}
+            full_feature_vector.pop('Niche_Label', None)
+            vectors.append(full_feature_vector)
+        return vectors
+
+    def create_influencer_profile_vector(
+            self,
+            historical_data: Dict[str, Any],
+            current_niche_label: str
+    ) -> Dict[str, Any]:
+        """
+        Builds the profile-level input for Agent 4 (Ranking): the numeric historical
+        metrics plus the influencer's current niche label (used by its diagnostics).
+        """
+        profile_vector = {
+            k: v for k, v in historical_data.items()
+            if isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+        }
+        profile_vector['Niche_Label'] = current_niche_label
+        return profile_vector
 
     def get_influencer_diagnostics(self, influencer_profile_features: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -1,7 +1,7 @@
 import re
 import os
-import joblib
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from ._model_loader import load_joblib
 # Mock imports for NLP dependencies
 # from transformers import AutoTokenizer, AutoModel
 
@@ -9,6 +9,19 @@ from typing import Dict, Any, List
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 MODEL_DIR = os.path.join(PROJECT_ROOT, 'models')
 
+_HASHTAG_RE = re.compile(r'#\w+')
+
+# Keyword -> niche label; when keywords of several niches occur, the earlier niche in
+# _NICHE_PRIORITY wins. All keywords are matched in one pass over the lowercased caption.
+_NICHE_KEYWORDS = {
+    'food': 'Minimalist Cooking',
+    'recipe': 'Minimalist Cooking',
+    'workout': 'Home Fitness',
+    'fitness': 'Home Fitness',
+}
+_NICHE_PRIORITY = ('Minimalist Cooking', 'Home Fitness')
+_NICHE_KEYWORD_RE = re.compile('|'.join(map(re.escape, _NICHE_KEYWORDS)))
+
 class NicheProfilerAgent:
     """
     Agent 1: Extracts text-based features (Niche, Sentiment, Readability)
@@ -29,7 +42,7 @@ class NicheProfilerAgent:
             print(f"WARNING: Model artifact not found at {model_path}. Agent will run in mock mode.")
             return None
         try:
-            model = joblib.load(model_path)
+            model = load_joblib(model_path)
             print(f"SUCCESS: Agent 1 ({self.MODEL_FILENAME}) loaded.")
             return model
         except Exception as e:
@@ -40,7 +53,7 @@ class NicheProfilerAgent:
         """Simulates the full NLP pipeline execution, including model inference."""
         # Initial Feature Engineering
         caption_len = len(caption)
-        hashtag_count = len(re.findall(r'#\w+', caption))
+        hashtag_count = sum(1 for _ in _HASHTAG_RE.finditer(caption))
 
         # NLP Model Inference (Simulated)
         if self.is_ready:
@@ -54,12 +67,7 @@ class NicheProfilerAgent:
             sentiment_score = 0.6
 
         # Niche Classification (Simulated Categorical Output)
-        if 'food' in caption.lower() or 'recipe' in caption.lower():
-            niche_label = 'Minimalist Cooking'
-        elif 'workout' in caption.lower() or 'fitness' in caption.lower():
-            niche_label = 'Home Fitness'
-        else:
-            niche_label = 'Lifestyle'
+        niche_label = self._classify_niche(caption.lower())
 
         # Returns the core features needed for the downstream models
         return {
@@ -71,6 +79,17 @@ class NicheProfilerAgent:
             'Readability_Score': 0.85 # Mock output
         }
 
+    @staticmethod
+    def _classify_niche(caption_lower: str) -> str:
+        """Maps a lowercased caption to a niche label via a single keyword scan."""
+        found = set()
+        for match in _NICHE_KEYWORD_RE.finditer(caption_lower):
+            label = _NICHE_KEYWORDS[match.group()]
+            if label == _NICHE_PRIORITY[0]:
+                return label  # highest priority niche; no need to scan further
+            found.add(label)
+        return next((label for label in _NICHE_PRIORITY if label in found), 'Lifestyle')
+
     def extract_features(self, caption: str) -> Dict[str, Any]:
         """
         Extracts complex, text-based features from the influencer's caption.
@@ -89,6 +108,16 @@ class NicheProfilerAgent:
                 'Readability_Score': 0.5
             }
 
+    def extract_feature_parts(self, caption: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Same as extract_features, split into (numeric features, metadata) so that callers
+        building model inputs do not need to type-filter the result.
+        The metadata currently holds only the categorical 'Niche_Label'.
+        """
+        features = self.extract_features(caption)
+        meta = {'Niche_Label': features.pop('Niche_Label', 'Unknown')}
+        return features, meta
+
     def predict(self, input_features: Dict[str, Any]) -> Any:
         """Agent 1 is a feature extractor; its direct prediction is the Niche Label."""
         return input_features.get('Niche_Label', 'Unknown')
@@ -1,13 +1,24 @@
 import numpy as np
-import pandas as pd
 import os
-import joblib
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from ._model_loader import load_joblib
 
 # Define the absolute path to the project's root directory for model loading
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 MODEL_DIR = os.path.join(PROJECT_ROOT, 'models')
 
+# Market tiers as (min score, tier, fee base USD, fee per score point USD), best tier first.
+# Estimated post fee = base + slope * score (mock pricing logic for presentation).
+_TIER_TABLE = (
+    (90.0, "A-List Talent", 5000.0, 150.0),
+    (70.0, "High-Growth Asset", 2000.0, 75.0),
+    (0.0, "Scouting Target", 500.0, 30.0),
+)
+_TIER_THRESHOLDS = np.array([row[0] for row in _TIER_TABLE[:-1]])
+_TIER_NAMES = np.array([row[1] for row in _TIER_TABLE])
+_TIER_BASES = np.array([row[2] for row in _TIER_TABLE])
+_TIER_SLOPES = np.array([row[3] for row in _TIER_TABLE])
+
 
 class RecommendationAgent:
     """
@@ -20,6 +31,9 @@ class RecommendationAgent:
     def __init__(self):
         self.model = self._load_model()
         self.is_ready = self.model is not None
+        # Feature order expected by the estimator, when it records one (feature_names_in_)
+        feature_names = getattr(self.model, 'feature_names_in_', None)
+        self._feat_names: Optional[List[str]] = list(feature_names) if feature_names is not None else None
 
     def _load_model(self) -> Any:
         """Loads the serialized model artifact from the models directory."""
@@ -28,15 +42,45 @@ class RecommendationAgent:
             print(f"WARNING: Model artifact not found at {model_path}. Agent will run in mock mode.")
             return None
         try:
-            model = joblib.load(model_path)
+            model = load_joblib(model_path)
             print(f"SUCCESS: Agent 4 ({self.MODEL_FILENAME}) loaded.")
             return model
         except Exception as e:
             print(f"ERROR loading model {self.MODEL_FILENAME}: {e}. Running in mock mode.")
             return None
 
-    def _convert_features_to_df(self, features: Dict[str, Any]) -> pd.DataFrame:
-        """Converts the aggregated feature dictionary into a model input format."""
+    def _features_to_row(self, features: Dict[str, Any]) -> np.ndarray:
+        """
+        Converts the aggregated feature dictionary into a (1, n_features) model input
+        in the estimator's feature order (no per-call DataFrame construction).
+        Without a recorded order, the numeric features of this input are used, in input order
+        (what select_dtypes(np.number) keeps), so inputs with other keys are never misaligned.
+        """
+        feat_names = self._feat_names
+        if feat_names is None:
+            feat_names = [
+                k for k, v in features.items()
+                if isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+            ]
+        return np.fromiter(
+            (features.get(k, 0.0) for k in feat_names),
+            dtype=np.float64,
+            count=len(feat_names)
+        ).reshape(1, -1)
+
+    def _predict_score(self, features: Dict[str, Any]) -> float:
+        """Runs the ranker on a single profile."""
+        try:
+            return self.model.predict(self._features_to_row(features))[0]
+        except (ValueError, TypeError, KeyError):
+            # Estimators that select columns by name (e.g., ColumnTransformer pipelines) need a DataFrame
+            return self.model.predict(self._convert_features_to_df(features))[0]
+
+    def _convert_features_to_df(self, features: Dict[str, Any]):
+        """Converts the aggregated feature dictionary into a model input format (pandas DataFrame)."""
+        # pandas is only imported on this fallback path, keeping it out of worker cold start
+        import pandas as pd
+
         # Input features represent an influencer's historical profile, not a single post.
         df = pd.DataFrame([features])
         return df.select_dtypes(include=[np.number])
@@ -58,9 +102,8 @@ class RecommendationAgent:
             rank_score = self._mock_rank_score(influencer_profile_features)
         else:
             try:
-                df_input = self._convert_features_to_df(influencer_profile_features)
                 # Prediction is typically a single rank score (0 to 100)
-                rank_score = self.model.predict(df_input)[0]
+                rank_score = self._predict_score(influencer_profile_features)
             except Exception as e:
                 print(f"Prediction Error in RecommendationAgent: {e}. Falling back to mock prediction.")
                 rank_score = self._mock_rank_score(influencer_profile_features)
@@ -69,15 +112,10 @@ class RecommendationAgent:
         rank_score = float(np.clip(rank_score, 1, 100))
 
         # Translate score to value tiers (Mock logic for presentation)
-        if rank_score >= 90:
-            market_tier = "A-List Talent"
-            est_value = 5000 + rank_score * 150
-        elif rank_score >= 70:
-            market_tier = "High-Growth Asset"
-            est_value = 2000 + rank_score * 75
-        else:
-            market_tier = "Scouting Target"
-            est_value = 500 + rank_score * 30
+        for min_score, market_tier, fee_base, fee_slope in _TIER_TABLE:
+            if rank_score >= min_score:
+                break
+        est_value = fee_base + fee_slope * rank_score
 
         return {
             "Market_Value_Score": round(rank_score, 2),
@@ -85,6 +123,68 @@ class RecommendationAgent:
             "Estimated_Post_Fee_USD": round(est_value, 0)
         }
 
+    def predict_batch(self, profiles: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Scores many influencer profiles with a single model call (one (N, F) matrix
+        instead of N predict() calls). Returns the bounded Market Value Scores, shape (N,).
+        Without a recorded feature order, each profile is scored on its own columns (one call each).
+        """
+        scores = None
+        if self.is_ready and profiles and self._feat_names is None:
+            try:
+                scores = np.fromiter((self._predict_score(p) for p in profiles), dtype=np.float64, count=len(profiles))
+            except Exception as e:
+                print(f"Prediction Error in RecommendationAgent: {e}. Falling back to mock prediction.")
+                scores = None
+        elif self.is_ready and profiles:
+            try:
+                X = np.vstack([self._features_to_row(p) for p in profiles])
+                try:
+                    scores = self.model.predict(X)
+                except (ValueError, TypeError, KeyError):
+                    # Estimators that select columns by name need a DataFrame
+                    import pandas as pd
+                    scores = self.model.predict(pd.DataFrame(profiles)[self._feat_names])
+            except Exception as e:
+                print(f"Prediction Error in RecommendationAgent: {e}. Falling back to mock prediction.")
+                scores = None
+
+        if scores is None:
+            scores = np.fromiter((self._mock_rank_score(p) for p in profiles), dtype=np.float64, count=len(profiles))
+
+        # Ensure the scores are bounded
+        return np.clip(np.asarray(scores, dtype=np.float64), 1, 100)
+
+    @staticmethod
+    def _tier_indices(scores: np.ndarray) -> np.ndarray:
+        """Row of _TIER_TABLE for each score (vectorized version of the loop in predict())."""
+        conditions = [scores >= threshold for threshold in _TIER_THRESHOLDS]
+        return np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+
+    @staticmethod
+    def market_tiers(scores: np.ndarray) -> np.ndarray:
+        """Vectorized tier assignment matching the thresholds used in predict()."""
+        return _TIER_NAMES[RecommendationAgent._tier_indices(scores)]
+
+    def rank_batch(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Batched predict(): one model call, then tiers and fees for all profiles via
+        array lookups (np.select) and a single np.round per output column.
+        """
+        scores = self.predict_batch(profiles)
+        tier_idx = self._tier_indices(scores)
+        fees = np.round(_TIER_BASES[tier_idx] + _TIER_SLOPES[tier_idx] * scores)
+        rounded_scores = np.round(scores, 2)
+
+        return [
+            {
+                "Market_Value_Score": score,
+                "Market_Tier": tier,
+                "Estimated_Post_Fee_USD": fee
+            }
+            for score, tier, fee in zip(rounded_scores.tolist(), _TIER_NAMES[tier_idx].tolist(), fees.tolist())
+        ]
+
     def get_diagnostics(self, influencer_profile_features: Dict[str, Any]) -> Dict[str, Any]:
         """
         Provides strategic diagnostics based on the influencer's historical data (Niche Strategy Reports).
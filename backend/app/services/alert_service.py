@@ -4,22 +4,100 @@ alert_service.py
 Manages logic for creating, evaluating, and triggering user alerts based on
 market conditions, influencer metrics, and custom user thresholds.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from functools import lru_cache
+from bisect import bisect_left
+import asyncio
+from collections import defaultdict
+from itertools import chain
 import time  # for simulating check time
 
 from .firestore_service import get_firestore_service, FirestoreService
-from .influencer_service import get_influencer_service, InfluencerService
+from .influencer_service import get_influencer_service, InfluencerService, SearchFilters
 from ..core.config import get_settings, Settings
 from ..utils.decorators import log_calls
 
 
+# Alert condition type -> profile field it thresholds
+_CONDITION_FIELDS = {
+    "min_engagement_rate": "average_engagement_rate",
+    "min_market_score": "market_score",
+}
+
+# (sorted metric values, (influencer_id, profile) entries in the same order)
+MetricIndex = Tuple[List[float], List[Tuple[str, Dict[str, Any]]]]
+
+
+def _build_alert_index(influencer_map: Dict[str, Dict[str, Any]]) -> Dict[Optional[str], Dict[str, MetricIndex]]:
+    """
+    Indexes the market snapshot once per evaluation cycle: for each niche (and None =
+    any niche) and each condition type, the profiles sorted by that condition's metric.
+    Each alert is then answered with a binary search instead of a scan of every influencer.
+    """
+    grouped: Dict[Optional[str], Dict[str, List[Tuple[float, str, Dict[str, Any]]]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for influencer_id, profile in influencer_map.items():
+        niche = profile.get('niche_label')
+        for condition_type, field in _CONDITION_FIELDS.items():
+            entry = (profile.get(field) or 0, influencer_id, profile)
+            grouped[niche][condition_type].append(entry)
+            grouped[None][condition_type].append(entry)
+
+    index: Dict[Optional[str], Dict[str, MetricIndex]] = {}
+    for niche, by_condition in grouped.items():
+        index[niche] = {}
+        for condition_type, entries in by_condition.items():
+            entries.sort(key=lambda t: t[0])
+            index[niche][condition_type] = (
+                [value for value, _, _ in entries],
+                [(influencer_id, profile) for _, influencer_id, profile in entries]
+            )
+    return index
+
+
+def _eval_chunk(alerts: List[Dict[str, Any]],
+                alert_index: Dict[Optional[str], Dict[str, MetricIndex]]) -> List[Dict[str, Any]]:
+    """Evaluates a chunk of alert rules against the indexed market snapshot (no shared mutable state)."""
+    triggered_alerts = []
+    no_matches: MetricIndex = ([], [])
+
+    for alert in alerts:
+        # Initial alert structure example:
+        # { "condition_type": "min_engagement_rate", "value": 5.0, "niche": "Home Fitness" }
+
+        condition_type = alert.get("condition_type")
+        target_value = alert.get("value")
+        target_niche = alert.get("niche")
+
+        if condition_type not in _CONDITION_FIELDS or not target_value:
+            continue
+
+        # Check Niche and Condition Match: first profile in the niche at or above the threshold
+        values, entries = alert_index.get(target_niche or None, {}).get(condition_type, no_matches)
+        position = bisect_left(values, target_value)
+
+        # If an influencer matches the alert, record it (one trigger per alert rule)
+        if position < len(values):
+            influencer_id, profile = entries[position]
+            triggered_alerts.append({
+                "alert_id": alert.get("id"),
+                "user_id": alert.get("user_id"),
+                "message": f"Market alert triggered! Influencer {profile.get('username')} meets your criteria ({condition_type} >= {target_value}).",
+                "triggered_on": profile.get("username"),
+                "profile_link": f"/influencers/{influencer_id}"
+            })
+
+    return triggered_alerts
+
+
 class AlertService:
     """
     Handles persistence and evaluation of user-defined alert thresholds.
     Alerts are stored as private data, scoped to the user ID.
     """
     ALERT_COLLECTION = 'user_alerts'
+    ALERT_EVAL_CHUNK_SIZE = 500  # Alerts evaluated per worker-thread task
 
     def __init__(self, db: FirestoreService, settings: Settings, influencer_service: InfluencerService):
         self.db = db
@@ -91,71 +169,46 @@ class AlertService:
             return []
 
         print("INFO: Starting scheduled alert evaluation process.")
-        self._last_check_time = current_time
-        triggered_alerts = []
-
-        # Fetch relevant market data (Influencer profiles)
-        # fetch all influencers to evaluate alerts against
-        market_data = await self.influencer_service.search_and_filter_influencers({})
-        influencer_map = {p['id']: p for p in market_data}
+        previous_check_time, self._last_check_time = self._last_check_time, current_time
 
-        # Fetch all unique alerts for all users (in a real system, this would be complex)
+        # Fetch relevant market data (Influencer profiles) and all unique alerts for all users
+        # concurrently (in a real system, this would be complex).
         # Since it is mock, retrieve ALL private documents accessible to the service user
-        all_alerts = await self.db.get_collection(
-            collection_name=self.ALERT_COLLECTION,
-            is_private=True  # Since the service runs as an admin/authenticated user, it can see all its own documents
+        try:
+            # fetch all influencers to evaluate alerts against
+            market_data, all_alerts = await asyncio.gather(
+                self.influencer_service.search_and_filter_influencers(SearchFilters()),
+                self.db.get_collection(
+                    collection_name=self.ALERT_COLLECTION,
+                    is_private=True  # Since the service runs as an admin/authenticated user, it can see all its own documents
+                )
+            )
+        except Exception:
+            # A failed run does not count, so the scheduler's retry is not skipped as "too recent"
+            self._last_check_time = previous_check_time
+            raise
+        influencer_map = {p['id']: p for p in market_data['results']}
+
+        # Per-niche, per-metric sorted index of the snapshot (built once, O(I log I))
+        alert_index = _build_alert_index(influencer_map)
+
+        # Evaluate the alerts in chunks on worker threads; chunks share only the read-only index
+        chunks = [
+            all_alerts[i:i + self.ALERT_EVAL_CHUNK_SIZE]
+            for i in range(0, len(all_alerts), self.ALERT_EVAL_CHUNK_SIZE)
+        ]
+        chunk_results = await asyncio.gather(
+            *(asyncio.to_thread(_eval_chunk, chunk, alert_index) for chunk in chunks)
         )
-
-        # Evaluate each alert
-        for alert in all_alerts:
-            # Initial alert structure example:
-            # { "condition_type": "min_engagement_rate", "value": 5.0, "niche": "Home Fitness" }
-
-            condition_type = alert.get("condition_type")
-            target_value = alert.get("value")
-            target_niche = alert.get("niche")
-
-            if not condition_type or not target_value:
-                continue
-
-            for influencer_id, profile in influencer_map.items():
-
-                # Check Niche Match
-                if target_niche and profile.get('niche_label') != target_niche:
-                    continue
-
-                # Check Condition Match
-                is_triggered = False
-
-                if condition_type == "min_engagement_rate" and profile.get('average_engagement_rate',
-                                                                           0) >= target_value:
-                    is_triggered = True
-
-                elif condition_type == "min_market_score" and profile.get('market_score', 0) >= target_value:
-                    is_triggered = True
-
-                # If an influencer matches the alert, record it
-                if is_triggered:
-                    triggered_alerts.append({
-                        "alert_id": alert.get("id"),
-                        "user_id": alert.get("user_id"),
-                        "message": f"Market alert triggered! Influencer {profile.get('username')} meets your criteria ({condition_type} >= {target_value}).",
-                        "triggered_on": profile.get("username"),
-                        "profile_link": f"/influencers/{influencer_id}"
-                    })
-                    # Break after first match per alert rule to avoid redundant triggers
-                    break
+        triggered_alerts = list(chain.from_iterable(chunk_results))
 
         print(f"INFO: Alert evaluation complete. Found {len(triggered_alerts)} triggered alerts.")
         return triggered_alerts
 
 
 # Dependency Injection for Singleton Service
+# (dependencies are resolved on first call, not at import time)
 @lru_cache()
-def get_alert_service(
-        db: FirestoreService = get_firestore_service(),
-        settings: Settings = get_settings(),
-        influencer_service: InfluencerService = get_influencer_service()
-) -> AlertService:
+def get_alert_service() -> AlertService:
     """Dependency for FastAPI to get a singleton instance of the service."""
-    return AlertService(db, settings, influencer_service)
\ No newline at end of file
+    return AlertService(get_firestore_service(), get_settings(), get_influencer_service())
\ No newline at end of file
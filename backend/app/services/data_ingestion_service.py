@@ -5,14 +5,22 @@ Manages the process of receiving raw data, validating, cleaning, transforming,
 and storing it into the appropriate Firestore collections.
 This simulates the ETL (Extract, Transform, Load) pipeline for influencer data.
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from functools import lru_cache
+import asyncio
+import hashlib
 import time
 
 from .firestore_service import get_firestore_service, FirestoreService
-from ..ml_agents.niche_profiler_agent import NicheProfilerAgent
+from .influencer_service import invalidate_search_snapshot
+from ..ml_agents._registry import get_shared_agents
 from ..core.config import get_settings, Settings
 from ..utils.decorators import log_calls
+from ..core.logging_config import get_logger
+from ..utils.data_cleaning import build_search_tokens
+from ..utils.helpers import compute_etag
+
+logger = get_logger(__name__)
 
 
 class DataIngestionService:
@@ -22,26 +30,50 @@ class DataIngestionService:
     """
     INFLUENCER_COLLECTION = 'influencers'
     RAW_DATA_LOG_COLLECTION = 'raw_ingestion_logs'  # Private collection for audit
+    # Writes from concurrent requests are coalesced into shared batch commits
+    WRITE_BATCH_MAX_SIZE = FirestoreService.BATCH_WRITE_CHUNK_SIZE
+    WRITE_BATCH_WINDOW_SECONDS = 0.05
+    REQUIRED_RAW_FIELDS = frozenset({'username', 'platform', 'follower_count', 'recent_post_captions'})
+    # Re-scrapes often carry identical text, so niche labels are reused by content hash
+    NICHE_CACHE_SIZE = 4096
+    # Audit log entries are buffered and written in the background on this cadence
+    AUDIT_LOG_FLUSH_INTERVAL_SECONDS = 0.1
 
     def __init__(self, db: FirestoreService, settings: Settings):
         self.db = db
         self.settings = settings
         # The NicheProfilerAgent is used here to transform raw text/image inputs
         # into a categorized Niche Label before persistence.
-        self.niche_agent = NicheProfilerAgent()
+        self.niche_agent = get_shared_agents().niche
+        # BLAKE2b digest of (bio, captions) -> niche label, in least-recently-used order
+        self._niche_cache: Dict[bytes, str] = {}
+        # The market score is computed once here and stored, so searches can sort on it server-side
+        self.ranking_agent = get_shared_agents().recommendation
+        # Pending ([[(doc_ref, data), ...], ...], future) units of writes, drained by the write batcher task
+        # (None is the shutdown sentinel)
+        self._write_queue: "asyncio.Queue[Optional[Tuple[List[List[Tuple[Any, Dict[str, Any]]]], asyncio.Future]]]" = (
+            asyncio.Queue()
+        )
+        self._write_batcher: Optional[asyncio.Task] = None
+        # Buffered (doc_ref, log_entry) audit writes, flushed by the audit log flusher task
+        self._log_queue: List[Tuple[Any, Dict[str, Any]]] = []
+        self._log_lock = asyncio.Lock()
+        self._log_flusher: Optional[asyncio.Task] = None
+        # Set to ask the flusher to run a last flush and exit
+        self._log_flusher_stop = asyncio.Event()
 
-    async def _validate_raw_data(self, raw_data: Dict[str, Any]) -> bool:
+    def _validate_raw_data(self, raw_data: Dict[str, Any]) -> bool:
         """
         Performs basic validation on the raw incoming data payload.
         (e.g., checks for mandatory fields like 'username', 'follower_count').
         """
-        required_fields = ['username', 'platform', 'follower_count', 'recent_post_captions']
-        for field in required_fields:
-            if field not in raw_data:
-                print(f"VALIDATION ERROR: Missing required field '{field}'")
-                return False
-        if not isinstance(raw_data.get('recent_post_captions'), list):
-            print("VALIDATION ERROR: 'recent_post_captions' must be a list.")
+        # One set difference reports every missing field at once
+        missing = self.REQUIRED_RAW_FIELDS.difference(raw_data)
+        if missing:
+            logger.warning("Validation error: missing required fields %s", sorted(missing))
+            return False
+        if type(raw_data['recent_post_captions']) is not list:
+            logger.warning("Validation error: 'recent_post_captions' must be a list.")
             return False
         return True
 
@@ -57,19 +89,107 @@ class DataIngestionService:
         Returns:
             The ID of the processed influencer profile.
         """
-        if not self._validate_raw_data(raw_data):
-            # Log the invalid data but prevent processing
-            await self._log_raw_data(raw_data, status="INVALID")
+        # A single record is not isolated: processing errors propagate to the caller
+        profile_id = (await self.process_raw_influencer_data_batch([raw_data], isolate_errors=False))[0]
+        if profile_id is None:
             raise ValueError("Raw data failed validation. See logs for details.")
+        return profile_id
+
+    @log_calls
+    async def process_raw_influencer_data_batch(self, raw_list: List[Dict[str, Any]],
+                                                isolate_errors: bool = True) -> List[Optional[str]]:
+        """
+        Validates and enriches many raw records, then persists every profile upsert
+        and audit log entry together in batched commits (one round trip per
+        BATCH_WRITE_CHUNK_SIZE writes instead of two per record).
+        Each profile upsert and its audit log entry are committed in the same WriteBatch,
+        so a failure can never leave a profile without its audit record.
+
+        Args:
+            raw_list: Raw scraped data, one dictionary per influencer.
+            isolate_errors: When True, a record whose enrichment or scoring raises is logged
+                            and skipped instead of aborting the whole batch.
+
+        Returns:
+            The processed profile ID per record, in input order
+            (None for records that failed validation or processing).
+        """
+        profile_ids: List[Optional[str]] = [None] * len(raw_list)
+        invalid_log_ops: List[Tuple[Any, Dict[str, Any]]] = []
+        # (position, raw_data, processed_profile) for every record that was enriched
+        records: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+        for position, raw_data in enumerate(raw_list):
+            if not self._validate_raw_data(raw_data):
+                # Log the invalid data but prevent processing
+                invalid_log_ops.append(self._log_op(raw_data, status="INVALID"))
+                continue
+            try:
+                records.append((position, raw_data, self._build_profile(raw_data)))
+            except Exception as e:
+                if not isolate_errors:
+                    raise
+                logger.error("Processing failed for record %d (%s): %s", position, raw_data.get('username'), e)
+
+        try:
+            self._score_profiles([profile for _, _, profile in records])
+        except Exception:
+            if not isolate_errors:
+                raise
+            # Score the records one by one, so only the failing ones are skipped
+            scored = []
+            for position, raw_data, processed_profile in records:
+                try:
+                    self._score_profiles([processed_profile])
+                except Exception as e:
+                    logger.error("Scoring failed for record %d (%s): %s", position, raw_data.get('username'), e)
+                    continue
+                scored.append((position, raw_data, processed_profile))
+            records = scored
+
+        # Each unit is [profile upsert, its SUCCESS audit entry], committed atomically
+        units: List[List[Tuple[Any, Dict[str, Any]]]] = []
+        for position, raw_data, processed_profile in records:
+            profile_id = processed_profile["id"]
+            units.append([
+                (self.db.document_ref(self.INFLUENCER_COLLECTION, profile_id), processed_profile),
+                # Audit: Log the successful ingestion of the raw data (Private log)
+                self._log_op(raw_data, status="SUCCESS", profile_id=profile_id),
+            ])
+            profile_ids[position] = profile_id
+
+        # INVALID entries have no profile to stay consistent with, so they go through the audit log buffer
+        await self._write_logs(invalid_log_ops)
+        # Load + Audit: Update the processed profiles in the public collection
+        # (coalesced with concurrent ingestions into shared batch commits)
+        await self._write_units(units)
+        if units:
+            invalidate_search_snapshot()
+
+        for profile_id in profile_ids:
+            if profile_id is not None:
+                logger.info("Profile %s ingested and updated.", profile_id)
+        return profile_ids
+
+    def _score_profiles(self, profiles: List[Dict[str, Any]]):
+        """Adds the Market Value Score, tier and ETag to processed profiles (one batched ranker call)."""
+        for profile, ranking in zip(profiles, self.ranking_agent.rank_batch(profiles)):
+            profile["market_score"] = ranking["Market_Value_Score"]
+            profile["market_tier"] = ranking["Market_Tier"]
+            # Content hash served as the profile's HTTP ETag (lets polling clients get 304s)
+            profile["etag"] = compute_etag(profile)
+
+    def _build_profile(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Enriches and transforms one validated raw record into its processed profile (before scoring)."""
+        # Raw fields used more than once are read once
+        username = raw_data['username']
+        platform = raw_data['platform']
+        bio = raw_data.get('bio', '')
 
         # Enrichment: Use ML Agent to categorize the Niche
-        print(f"INFO: Running Niche Profiler Agent for {raw_data['username']}...")
+        logger.debug("Running Niche Profiler Agent for %s...", username)
 
         # The niche agent takes the influencer's text inputs (captions/bio)
-        niche_label = self.niche_agent.predict(
-            influencer_bio=raw_data.get('bio', ''),
-            recent_post_texts=raw_data['recent_post_captions']
-        )
+        niche_label = self._predict_niche(bio, raw_data['recent_post_captions'])
 
         # Transformation: Create the final structured document
         # simulate calculation of an average engagement rate based on raw data
@@ -79,61 +199,201 @@ class DataIngestionService:
         follower_count = raw_data['follower_count']
         mock_engagement_rate = (raw_data.get('recent_likes', 0) / follower_count) * 100 if follower_count > 0 else 0.0
 
-        profile_id = f"{raw_data['platform']}_{raw_data['username']}".lower()
+        profile_id = f"{platform}_{username}".lower()
 
         processed_profile = {
             "id": profile_id,
-            "username": raw_data['username'],
-            "platform": raw_data['platform'],
+            "username": username,
+            "platform": platform,
             "follower_count": follower_count,
             "average_engagement_rate": round(mock_engagement_rate, 2),
             "niche_label": niche_label,
-            "last_updated": time.time(),
+            "last_updated": time.time_ns(),  # Integer nanoseconds since the epoch
             # Copy other cleaned/transformed fields
-            "bio_summary": raw_data.get('bio', '').split('\n')[0],
-            "historical_data_link": f"/data/{profile_id}/history"  # Link to deeper data ( in Google Cloud Storage)
+            # First line only: split stops at the first newline instead of splitting the whole bio
+            "bio_summary": bio.split('\n', 1)[0],
+            "historical_data_link": f"/data/{profile_id}/history",  # Link to deeper data ( in Google Cloud Storage)
+            # Denormalized keywords used by the server-side free-text search (array_contains_any)
+            "search_tokens": build_search_tokens(username, bio)
         }
+        return processed_profile
 
-        # Load: Update the processed profile in the public collection
-        await self.db.set_document(
-            collection_name=self.INFLUENCER_COLLECTION,
-            doc_id=profile_id,
-            data=processed_profile,
-            is_private=False,  # public influencer database
-            merge=True  # Ensure existing profiles is updated
-        )
+    def _predict_niche(self, bio: str, captions: List[str]) -> str:
+        """Runs the Niche Profiler Agent, reusing the label of an identical earlier (bio, captions) payload."""
+        digest = hashlib.blake2b(digest_size=16)
+        for text in (bio, *captions):
+            # Unit separator between fields, so ('ab', 'c') and ('a', 'bc') hash differently
+            digest.update(str(text).encode())
+            digest.update(b'\x1f')
+        key = digest.digest()
 
-        # Audit: Log the successful ingestion of the raw data (Private log)
-        await self._log_raw_data(raw_data, status="SUCCESS", profile_id=profile_id)
+        niche_label = self._niche_cache.pop(key, None)
+        if niche_label is None:
+            # The agent classifies one caption-like text: the bio and captions, one per line
+            text_features = self.niche_agent.extract_features('\n'.join(str(text) for text in (bio, *captions)))
+            niche_label = self.niche_agent.predict(text_features)
+            if len(self._niche_cache) >= self.NICHE_CACHE_SIZE:
+                # Evict the least recently used entry (dicts keep insertion order)
+                del self._niche_cache[next(iter(self._niche_cache))]
+        # (Re)insert as the most recently used entry
+        self._niche_cache[key] = niche_label
+        return niche_label
 
-        print(f"SUCCESS: Profile {profile_id} ingested and updated.")
-        return profile_id
+    async def _write_units(self, units: List[List[Tuple[Any, Dict[str, Any]]]]):
+        """
+        Queues the units of (doc_ref, data) writes for the next batch commit and waits until
+        they are persisted. The writes of one unit always share a WriteBatch (atomic).
+        Writes directly when the batcher is not running (e.g., scripts).
+        """
+        if not units:
+            return
+        if self._write_batcher is None or self._write_batcher.done():
+            await self.db.batch_write_units(units, merge=True)  # Ensure existing profiles are updated
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((units, future))
+        await future
+
+    def start_write_batcher(self):
+        """Starts the background task that coalesces writes (called from the app lifespan)."""
+        if self._write_batcher is None or self._write_batcher.done():
+            self._write_batcher = asyncio.create_task(self._run_write_batcher())
 
-    async def _log_raw_data(self, raw_data: Dict[str, Any], status: str, profile_id: Optional[str] = None):
+    async def stop_write_batcher(self):
+        """Stops the batcher once it has committed everything queued before the call, then flushes any later writes."""
+        if self._write_batcher is None:
+            return
+        # Not cancelled: a cancellation could land mid-commit and drop the in-flight writes.
+        # The sentinel is queued behind the pending writes, so the loop commits them and exits.
+        await self._write_queue.put(None)
+        await self._write_batcher
+        self._write_batcher = None
+
+        # Writes queued after the sentinel (while the batcher was finishing)
+        pending = []
+        while not self._write_queue.empty():
+            pending.append(self._write_queue.get_nowait())
+        if pending:
+            await self._commit_writes(pending)
+
+    async def _run_write_batcher(self):
+        """
+        Drains the queue in batches of up to WRITE_BATCH_MAX_SIZE writes or WRITE_BATCH_WINDOW_SECONDS.
+        Returns after committing the writes queued ahead of the None sentinel (see stop_write_batcher).
         """
-        Logs the raw incoming data payload and its processing status for audit purposes.
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._write_queue.get()
+            if item is None:
+                return
+            pending = [item]
+            op_count = sum(len(unit) for unit in item[0])
+            deadline = loop.time() + self.WRITE_BATCH_WINDOW_SECONDS
+            while op_count < self.WRITE_BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._write_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                pending.append(item)
+                op_count += sum(len(unit) for unit in item[0])
+            await self._commit_writes(pending)
+
+    async def _commit_writes(self, pending: List[Tuple[List[List[Tuple[Any, Dict[str, Any]]]], asyncio.Future]]):
+        """Commits the queued writes and resolves the waiting requests with the outcome."""
+        try:
+            await self.db.batch_write_units([unit for units, _ in pending for unit in units], merge=True)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in pending:
+            if not future.done():
+                future.set_result(None)
+
+    def _log_flusher_running(self) -> bool:
+        return self._log_flusher is not None and not self._log_flusher.done()
+
+    async def _write_logs(self, log_ops: List[Tuple[Any, Dict[str, Any]]]):
+        """Buffers audit log writes for the flusher, or writes them directly when it is not running."""
+        if self._log_flusher_running():
+            await self._buffer_logs(log_ops)
+        else:
+            await self._write_units([[op] for op in log_ops])
+
+    async def _buffer_logs(self, log_ops: List[Tuple[Any, Dict[str, Any]]]):
+        """Appends audit log writes to the buffer drained by the audit log flusher."""
+        async with self._log_lock:
+            self._log_queue.extend(log_ops)
+
+    def start_audit_log_flusher(self):
+        """Starts the background task that writes buffered audit logs (called from the app lifespan)."""
+        if self._log_flusher is None or self._log_flusher.done():
+            self._log_flusher_stop.clear()
+            self._log_flusher = asyncio.create_task(self._run_audit_log_flusher())
+
+    async def stop_audit_log_flusher(self):
+        """Stops the flusher and writes any audit logs still buffered."""
+        if self._log_flusher is None:
+            return
+        # Not cancelled: a cancellation could land mid-flush, after the buffer swap, and drop those entries
+        self._log_flusher_stop.set()
+        await self._log_flusher
+        self._log_flusher = None
+        # Entries buffered while the flusher was finishing
+        await self._flush_audit_logs()
+
+    async def _run_audit_log_flusher(self):
+        """Flushes the audit log buffer every AUDIT_LOG_FLUSH_INTERVAL_SECONDS, and once more when stopped."""
+        while not self._log_flusher_stop.is_set():
+            try:
+                await asyncio.wait_for(self._log_flusher_stop.wait(), self.AUDIT_LOG_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush_audit_logs()
+
+    async def _flush_audit_logs(self):
+        """Writes all buffered audit logs with batched commits (BATCH_WRITE_CHUNK_SIZE entries per commit)."""
+        async with self._log_lock:
+            log_ops, self._log_queue = self._log_queue, []
+        if not log_ops:
+            return
+        try:
+            await self.db.batch_write(log_ops, merge=False)
+        except Exception as e:
+            # Keep the entries (ahead of newer ones) for the next flush
+            logger.error("Audit log flush of %d entries failed: %s", len(log_ops), e)
+            async with self._log_lock:
+                self._log_queue[:0] = log_ops
+
+    def _log_op(self, raw_data: Dict[str, Any], status: str,
+                profile_id: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Builds the audit log write for the raw incoming data payload and its processing status.
         This data is saved to a private collection under the service user's path.
         """
         log_entry = {
-            "timestamp": time.time(),
+            "timestamp": time.time_ns(),  # Integer nanoseconds since the epoch (exact audit ordering)
             "status": status,
             "payload": raw_data,
             "processed_profile_id": profile_id
         }
 
         # Log data is always stored privately under the service's current_user_id
-        await self.db.add_document(
-            collection_name=self.RAW_DATA_LOG_COLLECTION,
-            data=log_entry,
-            is_private=True
-        )
+        return self.db.document_ref(self.RAW_DATA_LOG_COLLECTION, is_private=True), log_entry
 
 
 # Dependency Injection for Singleton Service
+# (dependencies are resolved on first call, not at import time)
 @lru_cache()
-def get_data_ingestion_service(
-        db: FirestoreService = get_firestore_service(),
-        settings: Settings = get_settings()
-) -> DataIngestionService:
+def get_data_ingestion_service() -> DataIngestionService:
     """Dependency for FastAPI to get a singleton instance of the service."""
-    return DataIngestionService(db, settings)
\ No newline at end of file
+    return DataIngestionService(get_firestore_service(), get_settings())
\ No newline at end of file
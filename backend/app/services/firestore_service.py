@@ -5,10 +5,20 @@ Abstracts all interactions with the Google Firestore database.
 Handles initialization, authentication, and core CRUD operations on documents
 and collections for all backend services (Influencers, Alerts, ML Data).
 """
+import asyncio
 import json
 import os
-from typing import Dict, Any, Optional, Callable, List
+import random
+import uuid
+from functools import lru_cache
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from firebase_admin import credentials, initialize_app, firestore, auth
+from google.api_core.exceptions import Aborted, DeadlineExceeded
+
+from ..core.logging_config import get_logger
+
+# Per-operation messages are DEBUG with lazy %-formatting: nothing is formatted or written unless enabled
+logger = get_logger(__name__)
 
 # Simulate the interaction of firebase admin using simple classes for type hinting and structure for now
 
@@ -21,18 +31,25 @@ class MockFirestoreClient:
     def document(self, path: str):
         return MockDocumentRef(path)
 
+    def batch(self):
+        return MockWriteBatch()
+
 
 class MockCollectionRef:
     """Mock class representing a Firestore Collection reference."""
 
     def __init__(self, path: str):
         self.path = path
-        print(f"DEBUG: Initialized collection ref for: {path}")
+        logger.debug("Initialized collection ref for: %s", path)
+
+    def document(self, doc_id: Optional[str] = None):
+        """Simulates a document reference; a random ID is generated when none is given."""
+        return MockDocumentRef(f"{self.path}/{doc_id or uuid.uuid4().hex}")
 
     def add(self, data: Dict[str, Any]):
         """Simulates adding a new document."""
         mock_id = f"mock-doc-{len(data)}"
-        print(f"INFO: Added new document to {self.path} with mock ID {mock_id}")
+        logger.debug("Added new document to %s with mock ID %s", self.path, mock_id)
         return mock_id, MockDocumentRef(f"{self.path}/{mock_id}")
 
     def stream(self):
@@ -45,20 +62,48 @@ class MockCollectionRef:
 
     def where(self, field: str, op: str, value: Any):
         """Simulates a query condition."""
-        print(f"DEBUG: Query condition added: {field} {op} {value}")
+        logger.debug("Query condition added: %s %s %s", field, op, value)
+        return self
+
+    def order_by(self, field: str, direction: str = "ASCENDING"):
+        """Simulates a server-side sort."""
+        logger.debug("Query ordered by: %s %s", field, direction)
+        return self
+
+    def offset(self, count: int):
+        """Simulates skipping the first results server-side."""
+        return self
+
+    def limit(self, count: int):
+        """Simulates capping the number of results returned."""
         return self
 
     def get(self):
         """Simulates getting documents from a collection."""
         return self.stream()
 
+    def count(self):
+        """Simulates a server-side count() aggregation query."""
+        return MockAggregationQuery(len(self.stream()))
+
+
+class MockAggregationQuery:
+    """Mock class representing a Firestore aggregation (e.g., count()) query."""
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def get(self):
+        """Simulates running the aggregation; mirrors the SDK's nested result shape."""
+        return [[self]]
+
 
 class MockDocumentRef:
     """Mock class representing a Firestore Document reference."""
 
     def __init__(self, path: str):
         self.path = path
-        print(f"DEBUG: Initialized document ref for: {path}")
+        logger.debug("Initialized document ref for: %s", path)
 
     def get(self):
         """Simulates getting a single document."""
@@ -66,15 +111,31 @@ class MockDocumentRef:
 
     def set(self, data: Dict[str, Any], merge: bool = False):
         """Simulates setting or merging data into a document."""
-        print(f"INFO: Document {self.path} updated/set. Merge={merge}")
+        logger.debug("Document %s updated/set. Merge=%s", self.path, merge)
 
     def update(self, data: Dict[str, Any]):
         """Simulates updating existing fields in a document."""
-        print(f"INFO: Document {self.path} updated.")
+        logger.debug("Document %s updated.", self.path)
 
     def delete(self):
         """Simulates deleting a document."""
-        print(f"INFO: Document {self.path} deleted.")
+        logger.debug("Document %s deleted.", self.path)
+
+
+class MockWriteBatch:
+    """Mock class representing a Firestore WriteBatch (up to 500 writes, one commit)."""
+
+    def __init__(self):
+        self._writes: List[Tuple[MockDocumentRef, Dict[str, Any], bool]] = []
+
+    def set(self, doc_ref: "MockDocumentRef", data: Dict[str, Any], merge: bool = False):
+        """Queues a set/merge operation; nothing is sent until commit()."""
+        self._writes.append((doc_ref, data, merge))
+
+    async def commit(self):
+        """Simulates committing all queued writes in a single round trip (AsyncClient batches are awaited)."""
+        logger.debug("Committed write batch with %d operations.", len(self._writes))
+        self._writes.clear()
 
 
 class MockDocumentSnapshot:
@@ -90,11 +151,39 @@ class MockDocumentSnapshot:
         return self._data
 
 
+@lru_cache(maxsize=256)
+def _collection_base_path(app_id: str, user_id: Optional[str], collection_name: str, is_private: bool) -> str:
+    """Builds (once per app, user, collection and visibility) the collection path used by every CRUD call."""
+    if is_private:
+        return f"artifacts/{app_id}/users/{user_id}/{collection_name}"
+    return f"artifacts/{app_id}/public/data/{collection_name}"
+
+
+@lru_cache(maxsize=1)
+def get_firestore_client() -> MockFirestoreClient:
+    """
+    Provides the single Firestore client shared by every service.
+    One client multiplexes concurrent calls over its gRPC connection pool,
+    so it is created once per process instead of once per service.
+    """
+    # Placeholder for real Admin SDK initialization
+    # Later: firestore.AsyncClient(project=get_settings().FIREBASE_PROJECT_ID)
+    logger.info("Initializing shared Firestore client.")
+    return MockFirestoreClient()
+
+
 class FirestoreService:
     """
     Manages connections and operations with Firestore.
     Uses public and private data paths based on the application ID and user ID.
     """
+    # Operations per WriteBatch commit, kept below Firestore's 500-writes-per-batch limit
+    BATCH_WRITE_CHUNK_SIZE = 450
+    # Batch commits in flight at once; beyond ~40 the backend stops returning more throughput
+    BATCH_COMMIT_CONCURRENCY = 40
+    # Contention (Aborted) and timeouts (DeadlineExceeded) are retried with exponential backoff
+    BATCH_COMMIT_MAX_RETRIES = 5
+    BATCH_COMMIT_BACKOFF_SECONDS = 0.1
 
     def __init__(self):
         # Retrieve mandatory global variables from the runtime environment
@@ -117,10 +206,9 @@ class FirestoreService:
         self._authenticate_mock_user()
 
     def _initialize_db_client(self) -> MockFirestoreClient:
-        """Initializes the Firestore client (mocked)."""
-        print(f"INFO: Initializing Firestore client for App ID: {self.app_id}")
-        # Placeholder for real Admin SDK initialization
-        return MockFirestoreClient()
+        """Returns the shared, process-wide Firestore client (mocked)."""
+        logger.info("Using shared Firestore client for App ID: %s", self.app_id)
+        return get_firestore_client()
 
     def _authenticate_mock_user(self):
         """Simulates successful authentication using the provided token."""
@@ -128,11 +216,11 @@ class FirestoreService:
         if self.initial_auth_token:
             # Mocking user ID extraction from a valid token
             self.current_user_id = f"fastapi-user-{self.app_id}-authenticated"
-            print(f"INFO: Successfully authenticated mock user: {self.current_user_id}")
+            logger.info("Successfully authenticated mock user: %s", self.current_user_id)
         else:
             # Fallback for unauthenticated access or testing
             self.current_user_id = f"fastapi-guest-{self.app_id}"
-            print(f"WARNING: No auth token found. Using guest ID: {self.current_user_id}")
+            logger.warning("No auth token found. Using guest ID: %s", self.current_user_id)
 
     # --- Path Helpers ---
 
@@ -143,22 +231,37 @@ class FirestoreService:
         """
         if not self.current_user_id:
             raise Exception("Authentication required for private data access.")
-        return f"artifacts/{self.app_id}/users/{self.current_user_id}/{collection_name}"
+        return _collection_base_path(self.app_id, self.current_user_id, collection_name, True)
 
     def _get_public_collection_path(self, collection_name: str) -> str:
         """
         Generates the path for public/shared collections (e.g., influencer profiles).
         Path: /artifacts/{appId}/public/data/{collection_name}
         """
-        return f"artifacts/{self.app_id}/public/data/{collection_name}"
+        return _collection_base_path(self.app_id, None, collection_name, False)
+
+    def _collection_path(self, collection_name: str, is_private: bool = False) -> str:
+        """Returns the cached private or public path of a collection."""
+        if is_private:
+            return self._get_private_collection_path(collection_name)
+        return self._get_public_collection_path(collection_name)
+
+    def document_ref(self, collection_name: str, doc_id: Optional[str] = None, is_private: bool = False):
+        """
+        Returns a document reference for use with batch_write.
+        A new document ID is generated when doc_id is None (like add_document).
+        """
+        path = self._collection_path(collection_name, is_private)
+        if doc_id is None:
+            return self.db.collection(path).document()
+        return self.db.document(f"{path}/{doc_id}")
 
     # --- Core CRUD Operations ---
 
     async def get_document(self, collection_name: str, doc_id: str, is_private: bool = False) -> Optional[
         Dict[str, Any]]:
         """Retrieves a single document by ID."""
-        path = (self._get_private_collection_path(collection_name) if is_private else self._get_public_collection_path(
-            collection_name))
+        path = self._collection_path(collection_name, is_private)
         doc_ref = self.db.document(f"{path}/{doc_id}")
 
         snapshot = doc_ref.get()
@@ -171,8 +274,7 @@ class FirestoreService:
 
     async def get_collection(self, collection_name: str, is_private: bool = False) -> List[Dict[str, Any]]:
         """Retrieves all documents from a collection."""
-        path = (self._get_private_collection_path(collection_name) if is_private else self._get_public_collection_path(
-            collection_name))
+        path = self._collection_path(collection_name, is_private)
         collection_ref = self.db.collection(path)
 
         results = []
@@ -183,10 +285,51 @@ class FirestoreService:
                 results.append(data)
         return results
 
+    async def query(self, collection_name: str, filters: Optional[List[Tuple[str, str, Any]]] = None,
+                    order_by: Optional[Tuple[str, str]] = None, limit: Optional[int] = None, offset: int = 0,
+                    is_private: bool = False) -> List[Dict[str, Any]]:
+        """
+        Retrieves the documents matching a list of (field, op, value) filters.
+        Filters, the (field, 'ASCENDING' | 'DESCENDING') sort and the offset/limit window
+        are evaluated server-side (backed by the composite indexes in firestore.indexes.json),
+        so only the requested documents are transferred.
+        """
+        path = self._collection_path(collection_name, is_private)
+        query_ref = self.db.collection(path)
+        for field, op, value in filters or []:
+            query_ref = query_ref.where(field, op, value)
+        if order_by is not None:
+            query_ref = query_ref.order_by(order_by[0], direction=order_by[1])
+        if offset:
+            query_ref = query_ref.offset(offset)
+        if limit is not None:
+            query_ref = query_ref.limit(limit)
+
+        results = []
+        for doc in query_ref.stream():
+            if doc.exists:
+                data = doc.to_dict()
+                data['id'] = doc.id
+                results.append(data)
+        return results
+
+    async def count(self, collection_name: str, filters: Optional[List[Tuple[str, str, Any]]] = None,
+                    is_private: bool = False) -> int:
+        """
+        Counts the documents matching the filters using a count() aggregation query.
+        The aggregation runs server-side, so no documents are transferred.
+        """
+        path = self._collection_path(collection_name, is_private)
+        query_ref = self.db.collection(path)
+        for field, op, value in filters or []:
+            query_ref = query_ref.where(field, op, value)
+
+        aggregation_result = query_ref.count().get()
+        return int(aggregation_result[0][0].value)
+
     async def add_document(self, collection_name: str, data: Dict[str, Any], is_private: bool = False) -> str:
         """Adds a new document to a collection, returning the generated ID."""
-        path = (self._get_private_collection_path(collection_name) if is_private else self._get_public_collection_path(
-            collection_name))
+        path = self._collection_path(collection_name, is_private)
         collection_ref = self.db.collection(path)
 
         # Simulate an asynchronous add operation
@@ -196,17 +339,69 @@ class FirestoreService:
     async def set_document(self, collection_name: str, doc_id: str, data: Dict[str, Any], is_private: bool = False,
                            merge: bool = False):
         """Sets a document, potentially overwriting or merging."""
-        path = (self._get_private_collection_path(collection_name) if is_private else self._get_public_collection_path(
-            collection_name))
+        path = self._collection_path(collection_name, is_private)
         doc_ref = self.db.document(f"{path}/{doc_id}")
 
         # Simulate an asynchronous set operation
         doc_ref.set(data, merge=merge)
 
+    async def batch_write(self, ops: List[Tuple[Any, Dict[str, Any]]], chunk_size: int = BATCH_WRITE_CHUNK_SIZE,
+                          merge: bool = True):
+        """
+        Sets (doc_ref, data) pairs (see document_ref) with one WriteBatch commit per
+        chunk_size operations, instead of one round trip per document.
+        Operations may target different collections, public or private.
+        """
+        await self.batch_write_units([[op] for op in ops], chunk_size=chunk_size, merge=merge)
+
+    async def batch_write_units(self, units: List[List[Tuple[Any, Dict[str, Any]]]],
+                                chunk_size: int = BATCH_WRITE_CHUNK_SIZE, merge: bool = True):
+        """
+        Like batch_write, but the (doc_ref, data) pairs of one unit are never split across
+        batches: a WriteBatch commit is atomic, so each unit lands entirely or not at all.
+        Units (at most chunk_size operations each) are packed in order into shared batches.
+        """
+        batches = []
+        batch, size = None, 0
+        for unit in units:
+            if batch is None or size + len(unit) > chunk_size:
+                batch, size = self.db.batch(), 0
+                batches.append(batch)
+            for doc_ref, data in unit:
+                batch.set(doc_ref, data, merge=merge)
+            size += len(unit)
+
+        await self.commit_batches(batches)
+
+    async def commit_batches(self, batches: List[Any], concurrency: int = BATCH_COMMIT_CONCURRENCY):
+        """
+        Commits write batches concurrently, at most `concurrency` in flight, so the
+        total time is about one round trip per `concurrency` batches instead of one per batch.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def guarded(batch):
+            async with semaphore:
+                await self._commit_with_retry(batch)
+
+        await asyncio.gather(*(guarded(batch) for batch in batches))
+
+    async def _commit_with_retry(self, batch: Any):
+        """Commits one batch, retrying transient failures with jittered exponential backoff."""
+        for attempt in range(self.BATCH_COMMIT_MAX_RETRIES + 1):
+            try:
+                await batch.commit()
+                return
+            except (Aborted, DeadlineExceeded) as e:
+                if attempt == self.BATCH_COMMIT_MAX_RETRIES:
+                    raise
+                delay = self.BATCH_COMMIT_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random())
+                logger.warning("Batch commit failed (%s). Retrying in %.2fs...", e, delay)
+                await asyncio.sleep(delay)
+
     async def delete_document(self, collection_name: str, doc_id: str, is_private: bool = False):
         """Deletes a document by ID."""
-        path = (self._get_private_collection_path(collection_name) if is_private else self._get_public_collection_path(
-            collection_name))
+        path = self._collection_path(collection_name, is_private)
         doc_ref = self.db.document(f"{path}/{doc_id}")
 
         # Simulate an asynchronous delete operation
@@ -214,13 +409,7 @@ class FirestoreService:
 
 
 # Use a factory function to ensure a single, cached instance is used throughout the FastAPI app
-# Later: use functools.lru_cache for singleton pattern.
-_firestore_instance: Optional[FirestoreService] = None
-
-
+@lru_cache(maxsize=1)
 def get_firestore_service() -> FirestoreService:
     """Dependency for FastAPI to get a singleton instance of the service."""
-    global _firestore_instance
-    if _firestore_instance is None:
-        _firestore_instance = FirestoreService()
-    return _firestore_instance
\ No newline at end of file
+    return FirestoreService()
\ No newline at end of file
@@ -5,12 +5,78 @@ Encapsulates all business logic related to influencer data management.
 Handles fetching single profiles, executing complex search and filter queries,
 and aggregating data for the API endpoints.
 """
-from typing import Dict, Any, List, Optional
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 from functools import lru_cache
+import numpy as np
+import orjson
+from pydantic import BaseModel
+from redis.asyncio import Redis
 
 from .firestore_service import get_firestore_service, FirestoreService
-from ..ml_agents.recommendation_agent import RecommendationAgent  # Used to calculate a derived metric
+from ..ml_agents._registry import get_shared_agents  # RecommendationAgent calculates a derived metric
 from ..core.config import get_settings
+from ..core.cache import get_redis_client
+from ..core.logging_config import get_logger
+from ..utils.data_cleaning import build_search_tokens
+from ..utils.helpers import compute_etag
+
+logger = get_logger(__name__)
+
+
+def _score_features(profile: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """
+    The ranker's input for a profile, as hashable (field, value) pairs in profile order:
+    its numeric fields, the only ones the RecommendationAgent reads (bools and
+    non-numeric fields are dropped by its feature selection). last_updated is one of them,
+    so a re-ingested profile gets a new key instead of a stale cached score.
+    """
+    return tuple(
+        (field, value) for field, value in profile.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    )
+
+
+# Bumped on every profile write; in-memory search snapshots from an older generation are rebuilt
+_profile_generation = 0
+
+
+def invalidate_search_snapshot():
+    """Marks the in-memory search snapshots as stale (called after profiles are written)."""
+    global _profile_generation
+    _profile_generation += 1
+
+
+@dataclass(slots=True, frozen=True)
+class SearchFilters:
+    """
+    Search criteria and pagination for an influencer search.
+    Frozen (hashable), so identical searches can share a cache key.
+    """
+    q: Optional[str] = None
+    niche: Optional[str] = None
+    min_engagement_rate: float = 0.0
+    min_followers: int = 0
+    max_followers: Optional[int] = None
+    limit: Optional[int] = None  # None -> settings.DEFAULT_SEARCH_LIMIT
+    page: int = 1
+
+
+@dataclass(slots=True)
+class _ProfileColumns:
+    """
+    Columnar (structure-of-arrays) snapshot of all profiles for in-memory search.
+    Rows are ordered by market score (best first), so a filtered selection is already ranked.
+    """
+    generation: int
+    fetched_at: float
+    follower_count: np.ndarray  # int64
+    engagement: np.ndarray  # float64 (matches the API's float thresholds exactly)
+    niche: np.ndarray  # object (str)
+    search_tokens: List[frozenset]
+    profiles: np.ndarray  # object (dict)
 
 
 class InfluencerService:
@@ -18,12 +84,27 @@ class InfluencerService:
     Manages the lifecycle and querying of influencer profile data.
     """
     INFLUENCER_COLLECTION = 'influencers'
+    PROFILE_CACHE_PREFIX = 'inf:'
+    SCORE_CACHE_SIZE = 8192
 
-    def __init__(self, db: FirestoreService):
+    def __init__(self, db: FirestoreService, cache: Optional[Redis] = None):
         self.db = db
+        self.cache = cache
         self.settings = get_settings()
-        # Initialize the RecommendationAgent to use its ranking/scoring logic
-        self.ranking_agent = RecommendationAgent()
+        # Use the shared RecommendationAgent for its ranking/scoring logic
+        self.ranking_agent = get_shared_agents().recommendation
+        # Rankings memoized by the exact ranker input (see _score_features), LRU-evicted
+        self._score_cached = lru_cache(maxsize=self.SCORE_CACHE_SIZE)(self._score_fingerprint)
+        # In-memory search snapshot (only used when SEARCH_SERVER_SIDE is off)
+        self._profile_columns: Optional[_ProfileColumns] = None
+
+    def _score_fingerprint(self, features: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+        """Runs the ranker on exactly the cached feature dict (cache miss path)."""
+        return self.ranking_agent.predict(dict(features))
+
+    def _market_ranking(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the (cached) RecommendationAgent ranking for a profile; the result is shared, do not mutate it."""
+        return self._score_cached(_score_features(profile))
 
     async def get_influencer_profile(self, influencer_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -36,9 +117,10 @@ class InfluencerService:
                 doc_id=influencer_id,
                 is_private=False  # Public data path
             )
-            if profile:
-                # Augment the profile with a real-time market score from the agent
-                augmented_data = self.ranking_agent.predict(profile)
+            if profile and 'market_score' not in profile:
+                # market_score/market_tier are stored at ingestion; only profiles written
+                # before that are augmented with a real-time market score from the agent
+                augmented_data = self._market_ranking(profile)
                 profile['market_score'] = augmented_data.get('Market_Value_Score')
                 profile['market_tier'] = augmented_data.get('Market_Tier')
 
@@ -47,69 +129,217 @@ class InfluencerService:
             print(f"Error fetching influencer profile {influencer_id}: {e}")
             return None
 
-    async def search_and_filter_influencers(self, query_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def get_profile(self, influencer_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read-through cached profile lookup for the API.
+        Profiles only change on the ingestion cadence, so entries live for
+        ALERT_CHECK_INTERVAL_SECONDS (the staleness window the alerts pipeline already assumes).
+        """
+        key = f"{self.PROFILE_CACHE_PREFIX}{influencer_id}"
+        if self.cache is not None:
+            try:
+                cached = await self.cache.get(key)
+                if cached:
+                    return orjson.loads(cached)
+            except Exception:
+                logger.warning("Profile cache read failed for %s", influencer_id, exc_info=True)
+
+        profile = await self.get_influencer_profile(influencer_id)
+
+        if profile and self.cache is not None:
+            try:
+                await self.cache.set(key, orjson.dumps(profile), ex=self.settings.ALERT_CHECK_INTERVAL_SECONDS)
+            except Exception:
+                logger.warning("Profile cache write failed for %s", influencer_id, exc_info=True)
+        return profile
+
+    async def update_profile(self, influencer_id: str, user_id: str, update: BaseModel) -> bool:
+        """
+        Merges manual updates into an existing profile and invalidates its cached copy.
+        Only the fields explicitly set on the validated update model are written.
+        Returns False if the profile does not exist.
+        """
+        existing = await self.db.get_document(
+            collection_name=self.INFLUENCER_COLLECTION,
+            doc_id=influencer_id,
+            is_private=False
+        )
+        if not existing:
+            return False
+
+        # Firestore update map built from the set fields only (no full model_dump copy)
+        update_data = {field: getattr(update, field) for field in update.model_fields_set}
+
+        # Refresh the stored ETag so clients holding the old one receive the updated profile
+        existing.pop('etag', None)
+        update_data["etag"] = compute_etag({**existing, **update_data})
+
+        await self.db.set_document(
+            collection_name=self.INFLUENCER_COLLECTION,
+            doc_id=influencer_id,
+            data=update_data,
+            is_private=False,
+            merge=True
+        )
+
+        if self.cache is not None:
+            await self.cache.delete(f"{self.PROFILE_CACHE_PREFIX}{influencer_id}")
+        invalidate_search_snapshot()
+        return True
+
+    # Firestore caps the number of values accepted by an 'array_contains_any' filter
+    MAX_SEARCH_TOKENS = 30
+
+    def _build_query_filters(self, search: SearchFilters) -> List[Tuple[str, str, Any]]:
+        """
+        Translates API search parameters into Firestore (field, op, value) filters
+        so that filtering happens server-side instead of after a full collection read.
+        """
+        filters = []
+
+        # Niche Filter (e.g., niche_label = 'Home Fitness')
+        if search.niche:
+            filters.append(('niche_label', '==', search.niche))
+
+        # Engagement Rate Filter (e.g., min_engagement = 3.0)
+        if search.min_engagement_rate:
+            filters.append(('average_engagement_rate', '>=', search.min_engagement_rate))
+
+        # Follower Range Filter (Follower_Count between min/max)
+        if search.min_followers:
+            filters.append(('follower_count', '>=', search.min_followers))
+        if search.max_followers is not None:
+            filters.append(('follower_count', '<=', search.max_followers))
+
+        # Free-text Filter: matched against the pre-tokenized 'search_tokens' field
+        if search.q:
+            tokens = build_search_tokens(search.q)[:self.MAX_SEARCH_TOKENS]
+            if tokens:
+                filters.append(('search_tokens', 'array_contains_any', tokens))
+
+        return filters
+
+    async def search_and_filter_influencers(self, search: SearchFilters) -> Dict[str, Any]:
         """
         Executes a complex search and filter operation on the public influencer data.
 
         Args:
-            query_params: Dictionary containing search criteria (e.g., niche, min_engagement, follower_range).
+            search: Search criteria (e.g., q, niche, min_engagement_rate, follower range)
+                    and pagination (limit, page).
 
         Returns:
-            A list of filtered and scored influencer profiles.
+            A dictionary with the total number of matching profiles ('total') and the
+            filtered, scored profiles for the requested page ('results').
         """
-        print(f"Executing search with parameters: {query_params}")
+        logger.debug("Executing search with parameters: %s", search)
+
+        if not self.settings.SEARCH_SERVER_SIDE:
+            total, page_results = await self._search_in_memory(search)
+            return {
+                "total": total,
+                "results": page_results
+            }
 
-        # Simulate fetching and then filter in memory for simplicity.
+        filters = self._build_query_filters(search)
+
+        # The total comes from a server-side count() aggregation, issued concurrently with the read.
+        total, page_results = await asyncio.gather(
+            self.db.count(
+                collection_name=self.INFLUENCER_COLLECTION,
+                filters=filters,
+                is_private=False
+            ),
+            self._fetch_ranked_page(search, filters)
+        )
+        return {
+            "total": total,
+            "results": page_results
+        }
 
-        raw_results = await self.db.get_collection(              # self self.db.get_collection(
+    async def _fetch_ranked_page(self, search: SearchFilters,
+                                 filters: List[Tuple[str, str, Any]]) -> List[Dict[str, Any]]:
+        """Returns the requested page of matching profiles, best market score first (server-side search)."""
+        # Filters, ranking and pagination are all pushed down to Firestore (composite-indexed):
+        # market_score is stored at ingestion, so only the requested page is read.
+        limit = search.limit or self.settings.DEFAULT_SEARCH_LIMIT
+        return await self.db.query(
             collection_name=self.INFLUENCER_COLLECTION,
+            filters=filters,
+            order_by=('market_score', 'DESCENDING'),
+            offset=(search.page - 1) * limit,
+            limit=limit,
             is_private=False
         )
 
-        filtered_results = []
-        for profile in raw_results:
-            # --- Apply Filters ---
-
-            # Niche Filter (e.g., niche_label = 'Home Fitness')
-            niche_filter = query_params.get('niche')
-            if niche_filter and profile.get('niche_label') != niche_filter:
-                continue
-
-            # Engagement Rate Filter (e.g., min_engagement = 3.0)
-            min_engagement = query_params.get('min_engagement_rate')
-            if min_engagement and profile.get('average_engagement_rate', 0) < min_engagement:
-                continue
-
-            # Follower Range Filter (Follower_Count between min/max)
-            min_followers = query_params.get('min_followers', 0)
-            max_followers = query_params.get('max_followers', float('inf'))
-            follower_count = profile.get('follower_count', 0)
-            if not (min_followers <= follower_count <= max_followers):
-                continue
-
-            # --- Augment and Score ---
-
-            # Calculate a real-time market score for ranking purposes
-            augmented_data = self.ranking_agent.predict(profile)
-            profile['market_score'] = augmented_data.get('Market_Value_Score')
-            profile['market_tier'] = augmented_data.get('Market_Tier')
-
-            filtered_results.append(profile)
-
-        # Sort by the market score (best matches first)
-        sorted_results = sorted(
-            filtered_results,
-            key=lambda x: x.get('market_score', 0),
-            reverse=True
+    # --- In-memory search (SEARCH_SERVER_SIDE off) ---
+
+    async def _get_profile_columns(self) -> _ProfileColumns:
+        """
+        Returns the columnar profile snapshot, rebuilding it after profile writes
+        or once it is older than ALERT_CHECK_INTERVAL_SECONDS.
+        """
+        columns = self._profile_columns
+        now = time.monotonic()
+        if (columns is not None and columns.generation == _profile_generation
+                and now - columns.fetched_at < self.settings.ALERT_CHECK_INTERVAL_SECONDS):
+            return columns
+
+        generation = _profile_generation
+        profiles = await self.db.get_collection(collection_name=self.INFLUENCER_COLLECTION, is_private=False)
+        profiles.sort(key=lambda p: p.get('market_score', 0.0), reverse=True)
+
+        count = len(profiles)
+        profile_array = np.empty(count, dtype=object)
+        profile_array[:] = profiles
+        columns = _ProfileColumns(
+            generation=generation,
+            fetched_at=now,
+            follower_count=np.fromiter((p.get('follower_count', 0) for p in profiles), dtype=np.int64, count=count),
+            engagement=np.fromiter(
+                (p.get('average_engagement_rate', 0.0) for p in profiles), dtype=np.float64, count=count
+            ),
+            niche=np.array([p.get('niche_label') for p in profiles], dtype=object),
+            search_tokens=[frozenset(p.get('search_tokens', ())) for p in profiles],
+            profiles=profile_array
         )
+        self._profile_columns = columns
+        return columns
+
+    def _filter_mask(self, columns: _ProfileColumns, search: SearchFilters) -> np.ndarray:
+        """Boolean mask of the snapshot rows matching the search (the same predicates as _build_query_filters)."""
+        mask = np.ones(len(columns.profiles), dtype=bool)
+        if search.niche:
+            mask &= columns.niche == search.niche
+        if search.min_engagement_rate:
+            mask &= columns.engagement >= search.min_engagement_rate
+        if search.min_followers:
+            mask &= columns.follower_count >= search.min_followers
+        if search.max_followers is not None:
+            mask &= columns.follower_count <= search.max_followers
+        if search.q:
+            tokens = frozenset(build_search_tokens(search.q)[:self.MAX_SEARCH_TOKENS])
+            if tokens:
+                mask &= np.fromiter(
+                    (not tokens.isdisjoint(row_tokens) for row_tokens in columns.search_tokens),
+                    dtype=bool,
+                    count=len(columns.search_tokens)
+                )
+        return mask
+
+    async def _search_in_memory(self, search: SearchFilters) -> Tuple[int, List[Dict[str, Any]]]:
+        """Returns (total matches, requested page) from the columnar snapshot."""
+        columns = await self._get_profile_columns()
+        matches = columns.profiles[self._filter_mask(columns, search)]
 
-        # Apply limit/pagination if provided in query_params
-        limit = query_params.get('limit', self.settings.DEFAULT_SEARCH_LIMIT)
-        return sorted_results[:limit]
+        limit = search.limit or self.settings.DEFAULT_SEARCH_LIMIT
+        start_index = (search.page - 1) * limit
+        # Only the page's profiles are materialized (copied, so callers cannot alter the snapshot)
+        return len(matches), [dict(profile) for profile in matches[start_index:start_index + limit]]
 
 
 # Dependency Injection for Singleton Service
+# (dependencies are resolved on first call, not at import time)
 @lru_cache()
-def get_influencer_service(db: FirestoreService = get_firestore_service()) -> InfluencerService:
+def get_influencer_service() -> InfluencerService:
     """Dependency for FastAPI to get a singleton instance of the service."""
-    return InfluencerService(db)
\ No newline at end of file
+    return InfluencerService(get_firestore_service(), get_redis_client())
\ No newline at end of file
@@ -1,12 +1,48 @@
-from typing import Dict, Any, List
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
 from functools import lru_cache
 
-from ..ml_agents.niche_profiler_agent import NicheProfilerAgent
-from ..ml_agents.content_visual_agent import ContentVisualAgent
+from .firestore_service import get_firestore_service, FirestoreService
+
+from ..ml_agents._registry import get_shared_agents
 from ..ml_agents.engagement_agent import EngagementAgent
-from ..ml_agents.recommendation_agent import RecommendationAgent
 from ..ml_agents.feature_orchestrator import FeatureOrchestrator
 
+# Inference workers are never forked from the (multi-threaded) server process: forkserver
+# starts them from a clean single-threaded process; spawn where forkserver is unavailable
+INFERENCE_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# The PLEP model of an inference worker process (loaded by _init_inference_worker)
+_worker_engagement_agent: Optional[EngagementAgent] = None
+
+
+def _init_inference_worker():
+    """Process-pool initializer: loads only the EngagementAgent, the one model _sync_predict needs."""
+    global _worker_engagement_agent
+    _worker_engagement_agent = EngagementAgent()
+
+
+def _sync_predict(features: Dict[str, float]) -> float:
+    """
+    Runs the PLEP model inside a process-pool worker. Only the small numeric
+    feature dict crosses the process boundary; the model stays resident in the worker.
+    """
+    return _worker_engagement_agent.predict(features)
+
+
+def create_inference_executor(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Creates the process pool for CPU-bound PLEP inference (attached to the service by the app lifespan).
+    Each worker loads only the EngagementAgent, once, when it starts.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(INFERENCE_START_METHOD),
+        initializer=_init_inference_worker
+    )
+
 
 class MLPredictionService:
     """
@@ -14,15 +50,20 @@ class MLPredictionService:
     Recommendation (Ranking) Agents. This class is the core business logic
     for all real-time ML inference requests from the API.
     """
+    INFLUENCER_COLLECTION = 'influencers'
 
-    def __init__(self):
-        # Initialize all agents and the orchestrator.
-        # This ensures model artifacts are loaded only ONCE upon service startup.
-        print("Initializing MLPredictionService and loading all ML Agents...")
-        self.niche_agent = NicheProfilerAgent()
-        self.visual_agent = ContentVisualAgent()
-        self.engagement_agent = EngagementAgent()
-        self.recommendation_agent = RecommendationAgent()
+    def __init__(self, db: FirestoreService):
+        self.db = db
+        # Process pool for CPU-bound inference; attached by the app lifespan (None = run inline)
+        self.executor: Optional[Executor] = None
+        # Reference the shared agents and build the orchestrator.
+        # Model artifacts are loaded only ONCE per process (see get_shared_agents).
+        print("Initializing MLPredictionService with the shared ML Agents...")
+        agents = get_shared_agents()
+        self.niche_agent = agents.niche
+        self.visual_agent = agents.visual
+        self.engagement_agent = agents.engagement
+        self.recommendation_agent = agents.recommendation
 
         self.orchestrator = FeatureOrchestrator(
             niche_agent=self.niche_agent,
@@ -49,9 +90,9 @@ class MLPredictionService:
         Returns:
             Dictionary containing prediction score and detailed feature diagnostics.
         """
-        # Orchestrate the full feature vector
+        # Orchestrate the full feature vector (the orchestrator expects numeric historical features)
         full_feature_vector = self.orchestrator.create_post_feature_vector(
-            influencer_profile,
+            {k: v for k, v in influencer_profile.items() if isinstance(v, (int, float))},
             caption,
             image_path,
             is_video
@@ -60,8 +101,8 @@ class MLPredictionService:
         # Get the PLEP Prediction (Agent 3)
         plep_score = self.engagement_agent.predict(full_feature_vector)
 
-        # Get Diagnostics for the Creator Dashboard
-        plep_diagnostics = self.engagement_agent.get_diagnostics(full_feature_vector)
+        # Get Diagnostics for the Creator Dashboard (reusing the score instead of predicting twice)
+        plep_diagnostics = self.engagement_agent.get_diagnostics(full_feature_vector, plep_score)
 
         return {
             "predicted_plep_percent": plep_score,
@@ -69,6 +110,41 @@ class MLPredictionService:
             "feature_vector_size": len(full_feature_vector),
         }
 
+    def get_post_plep_prediction_batch(
+            self,
+            profiles: List[Dict[str, Any]],
+            captions: List[str],
+            image_paths: List[str],
+            is_videos: List[bool]
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched version of get_post_plep_prediction: feature vectors for all posts are
+        built together and Agent 3 runs once on the stacked batch.
+
+        Returns:
+            One result dictionary per post (same shape as get_post_plep_prediction), in input order.
+        """
+        if len(profiles) == 1:
+            return [self.get_post_plep_prediction(profiles[0], captions[0], image_paths[0], is_videos[0])]
+
+        # Orchestrate all feature vectors (the orchestrator expects numeric historical features)
+        feature_vectors = self.orchestrator.create_post_feature_vector_batch(
+            [{k: v for k, v in profile.items() if isinstance(v, (int, float))} for profile in profiles],
+            list(zip(captions, image_paths, is_videos))
+        )
+
+        # Get the PLEP Predictions (Agent 3) with one model call
+        plep_scores = self.engagement_agent.predict_batch(feature_vectors).tolist()
+
+        return [
+            {
+                "predicted_plep_percent": plep_score,
+                "plep_diagnostics": self.engagement_agent.get_diagnostics(feature_vector, plep_score),
+                "feature_vector_size": len(feature_vector),
+            }
+            for feature_vector, plep_score in zip(feature_vectors, plep_scores)
+        ]
+
     def get_influencer_market_ranking(
             self,
             influencer_profile: Dict[str, Any]
@@ -101,6 +177,80 @@ class MLPredictionService:
             "strategic_report": strategic_report
         }
 
+    def get_influencer_market_ranking_batch(
+            self,
+            influencer_profiles: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched version of get_influencer_market_ranking (one Agent 4 model call for all profiles).
+        """
+        profile_vectors = [
+            self.orchestrator.create_influencer_profile_vector(
+                historical_data=profile,
+                current_niche_label=profile.get('Niche_Label', 'Unknown')
+            )
+            for profile in influencer_profiles
+        ]
+        rank_results = self.recommendation_agent.rank_batch(profile_vectors)
+
+        return [
+            {
+                "ranking": rank_result,
+                "strategic_report": self.recommendation_agent.get_diagnostics(profile_vector)
+            }
+            for profile_vector, rank_result in zip(profile_vectors, rank_results)
+        ]
+
+    async def predict_post_engagement_and_rank(
+            self,
+            influencer_id: str,
+            post_text: str,
+            mock_image_path: str,
+            is_video: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Runs the real-time PLEP prediction and Market Ranking for a new post
+        by a stored influencer.
+
+        The profile read (network-bound) and the post feature extraction (CPU-bound,
+        run off the event loop) are independent, so they are awaited concurrently.
+        """
+        profile, post_features = await asyncio.gather(
+            self.db.get_document(
+                collection_name=self.INFLUENCER_COLLECTION,
+                doc_id=influencer_id,
+                is_private=False
+            ),
+            asyncio.to_thread(
+                self.orchestrator.create_post_feature_vector, {}, post_text, mock_image_path, is_video
+            )
+        )
+        profile = profile or {}
+
+        # Combine the influencer's historical (numerical) metrics with the real-time post features
+        full_feature_vector = {k: v for k, v in profile.items() if isinstance(v, (int, float))}
+        full_feature_vector.update(post_features)
+
+        plep_score = await self._predict_engagement(full_feature_vector)
+        market_ranking = self.get_influencer_market_ranking(profile)
+
+        return {
+            "predicted_engagement_rate": plep_score,
+            "market_score": market_ranking["ranking"].get('Market_Value_Score', 0.0),
+            "niche_summary": f"Niche identified: {profile.get('niche_label', 'Unknown')}"
+        }
+
+    async def _predict_engagement(self, features: Dict[str, float]) -> float:
+        """
+        Runs the PLEP model in the inference process pool so the event loop keeps
+        serving requests during the model call. Falls back to inline inference
+        when no executor is attached (e.g., scripts, tests).
+        """
+        if self.executor is None:
+            return self.engagement_agent.predict(features)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _sync_predict, features)
+
     def get_feature_agent_diagnostics(self, influencer_profile: Dict[str, Any]) -> Dict[str, Any]:
         """
         Gathers diagnostic insights directly from the feature extraction agents.
@@ -113,4 +263,4 @@ class MLPredictionService:
 @lru_cache()
 def get_ml_prediction_service() -> MLPredictionService:
     """Dependency for FastAPI to get a singleton instance of the service."""
-    return MLPredictionService()
\ No newline at end of file
+    return MLPredictionService(get_firestore_service())
\ No newline at end of file
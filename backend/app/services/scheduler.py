@@ -5,90 +5,91 @@ Manages periodic background tasks for the application, such as checking
 alert thresholds and periodically updating metrics. This ensures crucial
 business logic runs independently of user API requests.
 """
-import threading
-import time
-from typing import Callable, Optional
+import asyncio
+from functools import lru_cache
+from typing import Optional
 
 from ..services.alert_service import get_alert_service, AlertService
 from ..core.config import get_settings
+from ..core.logging_config import get_logger
 
-# Global variable to manage the scheduler thread's state
-stop_event: Optional[threading.Event] = None
-scheduler_thread: Optional[threading.Thread] = None
+logger = get_logger(__name__)
 
 
 class BackgroundScheduler:
     """
     Simulates a background scheduler to run periodic tasks like alert checking.
+    Runs as an asyncio task on the application's event loop (no extra thread
+    competing with request handlers for the GIL); CPU-heavy parts of the jobs
+    are offloaded by the jobs themselves (see AlertService.evaluate_all_alerts).
     Later: Use a APScheduler or Celery library.
     """
 
     def __init__(self, alert_service: AlertService):
         self.alert_service = alert_service
         self.interval = get_settings().ALERT_CHECK_INTERVAL_SECONDS
-        print(f"INFO: Scheduler initialized. Alert check interval: {self.interval} seconds.")
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        logger.info("Scheduler initialized. Alert check interval: %s seconds.", self.interval)
 
-    def _periodic_task(self):
+    async def _periodic_task(self):
         """The main loop that executes background jobs."""
-        global stop_event
-
-        while not stop_event.is_set():
+        consecutive_failures = 0
+        while not self._stop.is_set():
+            delay = self.interval
             try:
-                print("SCHEDULER: Starting periodic task execution...")
+                logger.debug("Starting periodic task execution...")
 
                 # Execute the Alert Evaluation Logic
-                triggered_alerts = self.alert_service.evaluate_all_alerts()
+                triggered_alerts = await self.alert_service.evaluate_all_alerts()
+                consecutive_failures = 0
 
                 if triggered_alerts:
-                    print(f"SCHEDULER: Successfully triggered {len(triggered_alerts)} alerts!")
+                    logger.info("Successfully triggered %d alerts!", len(triggered_alerts))
                     # Later: send to a notification queue (e.g., email, push)
 
-                # Wait for the next interval or until the stop signal is received
-                stop_event.wait(self.interval)
-
             except Exception as e:
-                # Log the error but don't crash the thread
-                print(f"SCHEDULER ERROR: An error occurred during task execution: {e}")
-                time.sleep(self.interval)  # Wait before retrying
+                # Log the error but don't stop the loop; retry with exponential backoff (capped at the interval)
+                consecutive_failures += 1
+                delay = min(self.interval, 2 ** consecutive_failures)
+                logger.error("An error occurred during task execution: %s. Retrying in %ss.", e, delay)
 
-    def start(self):
-        """Starts the background scheduler thread."""
-        global stop_event, scheduler_thread
+            # Wait for the next run or until the stop signal is received (shutdown never waits out the delay)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
 
-        if scheduler_thread and scheduler_thread.is_alive():
-            print("WARNING: Scheduler is already running.")
+    def start(self):
+        """Starts the background scheduler task (must be called from the running event loop)."""
+        if self._task and not self._task.done():
+            logger.warning("Scheduler is already running.")
             return
 
-        print("SCHEDULER: Starting background thread.")
-        stop_event = threading.Event()
-        scheduler_thread = threading.Thread(target=self._periodic_task, daemon=True)
-        scheduler_thread.start()
+        logger.info("Starting background task.")
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._periodic_task())
 
-    def shutdown(self):
-        """Signals the background scheduler thread to stop gracefully."""
-        global stop_event, scheduler_thread
-
-        if scheduler_thread and scheduler_thread.is_alive():
-            print("SCHEDULER: Shutting down background thread...")
-            stop_event.set()
-            scheduler_thread.join(timeout=5)  # Wait up to 5 seconds for cleanup
-            if scheduler_thread.is_alive():
-                print("SCHEDULER WARNING: Thread did not stop gracefully.")
-            else:
-                print("SCHEDULER: Thread stopped successfully.")
+    async def shutdown(self):
+        """Signals the background scheduler task to stop gracefully."""
+        if self._task and not self._task.done():
+            logger.info("Shutting down background task...")
+            self._stop.set()
+            try:
+                # Wait up to 5 seconds for the current run to finish
+                await asyncio.wait_for(self._task, timeout=5)
+                logger.info("Task stopped successfully.")
+            except asyncio.TimeoutError:
+                logger.warning("Task did not stop gracefully and was cancelled.")
+            self._task = None
         else:
-            print("WARNING: Scheduler thread was not running.")
+            logger.warning("Scheduler task was not running.")
 
 
 # Singleton instance of the scheduler
-_scheduler_instance: Optional[BackgroundScheduler] = None
-
-
+@lru_cache(maxsize=1)
 def get_scheduler() -> BackgroundScheduler:
     """Provides a singleton instance of the scheduler."""
-    global _scheduler_instance
-    if _scheduler_instance is None:
-        # Resolve dependencies needed by the scheduler's tasks
-        alert_service = get_alert_service()
-        _scheduler_instance = BackgroundScheduler(alert_service=alert_service)
-    return _scheduler_instance
\ No newline at end of file
+    # Resolve dependencies needed by the scheduler's tasks
+    alert_service = get_alert_service()
+    return BackgroundScheduler(alert_service=alert_service)
\ No newline at end of file
@@ -6,20 +6,21 @@ low-level transformations on raw input data before it is persisted or used
 by the ML agents.
 """
 import re
+from functools import lru_cache
 from typing import Union, List, Dict, Any
 
+# Compiled once at import (normalize_text runs for every bio, caption and search query)
+_NON_ALNUM_RE = re.compile(r'[^\w\s\.\,\!\?]', re.UNICODE)
+_WS_RE = re.compile(r'\s+')
+
 
 def normalize_text(text: str) -> str:
     """
     Performs standard text cleaning: lowercase, removes extra whitespace,
     and removes common non-alphanumeric characters (keeps spaces and dots).
     """
-    text = text.lower()
-    # Remove emojis and certain symbols (keeping basic punctuation)
-    text = re.sub(r'[^\w\s\.\,\!\?]', '', text, flags=re.UNICODE)
-    # Standardize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # Remove emojis and certain symbols (keeping basic punctuation), then standardize whitespace
+    return _WS_RE.sub(' ', _NON_ALNUM_RE.sub('', text.lower())).strip()
 
 
 def safe_float_conversion(value: Any, default: float = 0.0) -> float:
@@ -27,17 +28,27 @@ def safe_float_conversion(value: Any, default: float = 0.0) -> float:
     Attempts to convert a value to a float, returning a default value on failure.
     Prevents crashes when parsing numerical metrics from raw data.
     """
-    if isinstance(value, (int, float)):
+    # Fast paths for the common exact types (no isinstance tuple check, no exception setup)
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
         return float(value)
-    try:
-        # Tries to remove commas if present
-        if isinstance(value, str):
+    if value_type is str:
+        # Only strip commas when there are any
+        if ',' in value:
             value = value.replace(',', '')
+        try:
+            return float(value)
+        except ValueError:
+            return default
+    try:
         return float(value)
     except (ValueError, TypeError):
         return default
 
 
+@lru_cache(maxsize=512)
 def standardize_niche_label(label: str) -> str:
     """
     Converts a machine-generated niche label into a standardized, display-ready format.
@@ -69,4 +80,21 @@ def clean_influencer_profile(raw_profile: Dict[str, Any]) -> Dict[str, Any]:
     if 'niche_label' in cleaned_profile:
         cleaned_profile['niche_label'] = standardize_niche_label(cleaned_profile['niche_label'])
 
-    return cleaned_profile
\ No newline at end of file
+    return cleaned_profile
+
+
+def build_search_tokens(*texts: str) -> List[str]:
+    """
+    Builds the denormalized, lowercased keyword list stored on each influencer
+    profile ('search_tokens'). Free-text search queries are tokenized the same way
+    and matched server-side with an 'array_contains_any' filter.
+    """
+    tokens: Dict[str, None] = {}  # dict keeps insertion order while de-duplicating
+    for text in texts:
+        if not text:
+            continue
+        for token in normalize_text(text).split():
+            token = token.strip('.,!?')
+            if token:
+                tokens[token] = None
+    return list(tokens)
@@ -4,6 +4,7 @@ decorators.py
 Custom Python decorators used throughout the application for common tasks
 like logging function calls, measuring execution time, and caching results.
 """
+import logging
 import time
 from functools import wraps
 from ..core.logging_config import get_logger
@@ -18,43 +19,45 @@ def log_calls(func: Callable) -> Callable:
     Decorator that logs the function's name and arguments upon entry and exit.
     Useful for tracing flow, especially across service boundaries.
     """
+    # Invariants of the decorated function, resolved once at decoration time
+    func_name = func.__name__
+    arg_names = func.__code__.co_varnames[:func.__code__.co_argcount]
+    # (position, name) of the positional parameters to log, excluding 'self' or 'cls'
+    logged_params = tuple((i, name) for i, name in enumerate(arg_names) if name not in ('self', 'cls'))
+
+    def format_args(args) -> dict:
+        return {name: args[i] for i, name in logged_params if i < len(args)}
 
     @wraps(func)
     async def async_wrapper(*args, **kwargs):
-        # Format arguments nicely for logging
-        func_name = func.__name__
-        arg_names = func.__code__.co_varnames[:func.__code__.co_argcount]
-
-        # Exclude 'self' or 'cls' from logging arguments
-        log_args = {name: value for name, value in zip(arg_names, args) if name not in ('self', 'cls')}
-        log_kwargs = kwargs
-
-        logger.info(f"START {func_name} with args={log_args}, kwargs={log_kwargs}")
+        # Only format arguments when INFO records are actually emitted
+        info_on = logger.isEnabledFor(logging.INFO)
+        if info_on:
+            logger.info("START %s with args=%s, kwargs=%s", func_name, format_args(args), kwargs)
 
         try:
             result = await func(*args, **kwargs)
-            logger.info(f"END {func_name}. Success.")
+            if info_on:
+                logger.info("END %s. Success.", func_name)
             return result
         except Exception as e:
-            logger.error(f"END {func_name}. FAILED with error: {e}", exc_info=False)
+            logger.error("END %s. FAILED with error: %s", func_name, e, exc_info=False)
             raise
 
     @wraps(func)
     def sync_wrapper(*args, **kwargs):
         # Same logging logic for synchronous functions
-        func_name = func.__name__
-        arg_names = func.__code__.co_varnames[:func.__code__.co_argcount]
-        log_args = {name: value for name, value in zip(arg_names, args) if name not in ('self', 'cls')}
-        log_kwargs = kwargs
-
-        logger.info(f"START {func_name} with args={log_args}, kwargs={log_kwargs}")
+        info_on = logger.isEnabledFor(logging.INFO)
+        if info_on:
+            logger.info("START %s with args=%s, kwargs=%s", func_name, format_args(args), kwargs)
 
         try:
             result = func(*args, **kwargs)
-            logger.info(f"END {func_name}. Success.")
+            if info_on:
+                logger.info("END %s. Success.", func_name)
             return result
         except Exception as e:
-            logger.error(f"END {func_name}. FAILED with error: {e}", exc_info=False)
+            logger.error("END %s. FAILED with error: %s", func_name, e, exc_info=False)
             raise
 
     # Determine if the function is synchronous or asynchronous
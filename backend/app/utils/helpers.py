@@ -4,27 +4,35 @@ helpers.py
 Contains miscellaneous helper functions that do not fit into the core
 configuration, security, or specific data cleaning modules.
 """
+import hashlib
 import math
-from typing import Union, Dict, Any, List
+from functools import lru_cache
+from typing import Union, Dict, Any, List, Optional
 import time
 
+import orjson
 
+# Display suffix per power of 1000
+_NUMBER_SUFFIXES = ('', 'K', 'M', 'B', 'T')
+
+# (unit length in seconds, unit name), largest first
+_TIME_UNITS = ((86400, 'days'), (3600, 'hours'), (60, 'minutes'))
+
+
+@lru_cache(maxsize=4096)
 def format_large_number(number: Union[int, float]) -> str:
     """
     Formats large numbers into K, M, B format (e.g., 1234567 -> 1.23M).
     Useful for displaying follower counts or engagement scores.
+    Cached: the same follower counts are formatted over and over in result tables.
     """
-    magnitude = 0
-    while abs(number) >= 1000:
-        magnitude += 1
-        number /= 1000.0
-
-    if magnitude == 0:
+    if abs(number) < 1000:
         return str(int(number))
 
-    # Use suffixes K, M, B
-    suffix = ['', 'K', 'M', 'B', 'T'][magnitude]
-    return f"{number:.2f}{suffix}".rstrip('0').rstrip('.')
+    # Power of 1000 straight from the digit count (capped at T) instead of repeated division
+    magnitude = min(int(math.log10(abs(number))) // 3, len(_NUMBER_SUFFIXES) - 1)
+    scaled = number / 1000.0 ** magnitude
+    return f"{scaled:.2f}".rstrip('0').rstrip('.') + _NUMBER_SUFFIXES[magnitude]
 
 
 def calculate_time_since(timestamp: float) -> str:
@@ -32,14 +40,10 @@ def calculate_time_since(timestamp: float) -> str:
     Calculates the time elapsed since a given Unix timestamp in a human-readable format.
     """
     diff = time.time() - timestamp
-    if diff < 60:
-        return f"{int(diff)} seconds ago"
-    elif diff < 3600:
-        return f"{int(diff // 60)} minutes ago"
-    elif diff < 86400:
-        return f"{int(diff // 3600)} hours ago"
-    else:
-        return f"{int(diff // 86400)} days ago"
+    for unit_seconds, unit_name in _TIME_UNITS:
+        if diff >= unit_seconds:
+            return f"{int(diff // unit_seconds)} {unit_name} ago"
+    return f"{int(diff)} seconds ago"
 
 
 def safe_dict_get(data: Dict[str, Any], keys: List[str], default: Any = None) -> Any:
@@ -56,3 +60,23 @@ def safe_dict_get(data: Dict[str, Any], keys: List[str], default: Any = None) ->
     return temp
 
 
+def compute_etag(data: Any) -> str:
+    """
+    Computes a short content hash used as an HTTP ETag for a stored document.
+    Keys are sorted so equal documents always produce the same tag.
+    """
+    return hashlib.blake2b(orjson.dumps(data, option=orjson.OPT_SORT_KEYS), digest_size=8).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    Checks an 'If-None-Match' request header against an ETag
+    (handles '*', comma-separated lists, quotes and weak 'W/' prefixes).
+    """
+    if not if_none_match or not etag:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/').strip('"') == etag:
+            return True
+    return False
@@ -5,6 +5,7 @@ Contains utility functions for image preprocessing and manipulation.
 Used by ML modules for image quality analysis or ML model input.
 """
 import numpy as np
+import xxhash
 from typing import Any
 
 def mock_image_path_to_array(image_path: str) -> np.ndarray:
@@ -18,13 +19,35 @@ def mock_image_path_to_array(image_path: str) -> np.ndarray:
     Returns:
         A deterministic, mock 3D NumPy array (H, W, C) representing the image.
     """
-    # Create a deterministic mock array based on the path hash
+    # Create a deterministic mock array based on a stable digest of the path (unlike hash(),
+    # which is salted per process, it gives the same pixels across runs and workers)
     # This simulates a successful image load for testing/mocking
     # Returns a 100x100 RGB image array (100, 100, 3)
-    np.random.seed(hash(image_path) % (2**32 - 1))
-    mock_array = np.random.randint(0, 256, size=(100, 100, 3), dtype=np.uint8)
+    # A local PCG64 generator: cheap to seed (no Mersenne Twister state init) and safe
+    # to call from concurrent loader threads
+    rng = np.random.default_rng(xxhash.xxh64_intdigest(image_path.encode()))
+    mock_array = rng.integers(0, 256, size=(100, 100, 3), dtype=np.uint8)
     return mock_array
 
+def image_bytes_to_array(image_bytes: bytes) -> np.ndarray:
+    """
+    Decodes an encoded image (JPEG/PNG/WebP) held in memory into a NumPy array,
+    without a round trip through the filesystem.
+
+    Args:
+        image_bytes: The encoded image payload (e.g., a downloaded post image).
+
+    Returns:
+        A 3D uint8 NumPy array (H, W, C) in RGB channel order.
+    """
+    import cv2  # Only needed for real payloads; the mock loader has no OpenCV dependency
+
+    # frombuffer wraps the payload without copying it; imdecode writes straight into a new uint8 array
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image bytes.")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
 def mock_video_frame_capture(video_path: str) -> np.ndarray:
     """
     Simulates capturing a frame from a video file (e.g., using cv2.VideoCapture).
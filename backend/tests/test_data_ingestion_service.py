@@ -0,0 +1,85 @@
+"""
+test_data_ingestion_service.py
+------------------------------
+Ingests records end to end through the real ML agents (mock mode when no
+model artifacts are present) and the mocked Firestore client.
+"""
+import asyncio
+
+from app.core.config import get_settings
+from app.services.data_ingestion_service import DataIngestionService
+from app.services.firestore_service import FirestoreService
+
+
+def _capture_commits(db: FirestoreService):
+    """Records the (path, data) writes of every committed batch, one list per batch."""
+    committed = []
+    commit_batches = db.commit_batches
+
+    async def recording_commit_batches(batches, *args, **kwargs):
+        committed.extend([(doc_ref.path, data) for doc_ref, data, _ in batch._writes] for batch in batches)
+        await commit_batches(batches, *args, **kwargs)
+
+    db.commit_batches = recording_commit_batches
+    return committed
+
+
+def test_ingest_one_record():
+    db = FirestoreService()
+    committed = _capture_commits(db)
+    service = DataIngestionService(db, get_settings())
+
+    profile_id = asyncio.run(service.process_raw_influencer_data({
+        'username': 'FitAlex',
+        'platform': 'Instagram',
+        'follower_count': 12000,
+        'recent_likes': 600,
+        'bio': 'Coach',
+        'recent_post_captions': ['Morning workout #fitness'],
+    }))
+
+    assert profile_id == 'instagram_fitalex'
+    # The profile and its audit entry are committed together in one batch
+    assert len(committed) == 1
+    (profile_path, profile), (log_path, log_entry) = committed[0]
+    assert profile_path.endswith(f"influencers/{profile_id}")
+    assert profile['niche_label'] == 'Home Fitness'
+    assert profile['average_engagement_rate'] == 5.0
+    assert 'market_score' in profile
+    assert '/raw_ingestion_logs/' in log_path
+    assert log_entry['status'] == 'SUCCESS'
+    assert log_entry['processed_profile_id'] == profile_id
+
+
+def test_stop_write_batcher_commits_pending_writes():
+    db = FirestoreService()
+    committed = _capture_commits(db)
+    service = DataIngestionService(db, get_settings())
+    unit = [(db.document_ref('influencers', 'p1'), {'id': 'p1'})]
+
+    async def run():
+        service.start_write_batcher()
+        writes = [asyncio.create_task(service._write_units([unit])) for _ in range(3)]
+        # Stop while the batcher holds the writes in its coalescing window
+        await asyncio.sleep(service.WRITE_BATCH_WINDOW_SECONDS / 5)
+        await service.stop_write_batcher()
+        # Every writer is resolved by the final commit, none is left waiting
+        await asyncio.wait_for(asyncio.gather(*writes), timeout=1)
+
+    asyncio.run(run())
+    assert sum(len(batch) for batch in committed) == 3
+
+
+def test_stop_audit_log_flusher_writes_buffered_entries():
+    db = FirestoreService()
+    committed = _capture_commits(db)
+    service = DataIngestionService(db, get_settings())
+
+    async def run():
+        service.start_audit_log_flusher()
+        await service._write_logs([service._log_op({'username': 'x'}, status="INVALID") for _ in range(3)])
+        await service.stop_audit_log_flusher()
+
+    asyncio.run(run())
+    assert sum(len(batch) for batch in committed) == 3
+    assert not service._log_queue
@@ -4,8 +4,11 @@ scripts/data/ingest_public_data.py
 import pandas as pd
 import numpy as np
 import os
+import re
+import sys
 import kagglehub
-import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from sklearn.model_selection import train_test_split
 from typing import List
 
@@ -29,19 +32,33 @@ KAGGLE_DATASETS = {
     "ranking_data": "whenamancodes/top-200-influencers-crushing-on-instagram"  # 200 Influencers
 }
 
+# Columns used downstream, per dataset (everything else in the raw CSVs is never read)
+DATASET_USECOLS = {
+    "plep_data": ['owner_id', 'owner_username', 'username', 'is_video', 'caption', 'created_at', 'imageUrl',
+                  'followers', 'following', 'likes', 'comments'],
+    "niche_supplement": ['Sr No', 'Image File', 'Caption'],
+    "ranking_data": ['Channel Info', 'Influence Score', 'Posts', 'Followers', 'Avg. Likes', '60-Day Eng Rate',
+                     'New Post Avg. Likes', 'Total Likes'],
+}
+
+# Numeric portion of a raw likes/comments value (compiled once)
+_NUM_RE = re.compile(r'([-+]?\d*\.?\d+)')
+
 
 # --- Utility Functions for Kaggle Loading ---
 
+@lru_cache(maxsize=32)
 def find_csv_in_path(path: str) -> str:
-    """Finds the first CSV file in the downloaded Kaggle path."""
-    # Search recursively for CSV files
-    csv_files = glob.glob(os.path.join(path, '**', '*.csv'), recursive=True)
-    if not csv_files:
-        raise FileNotFoundError(f"No CSV file found in the downloaded path: {path}")
+    """Finds the first CSV file in the downloaded Kaggle path (cached per path)."""
+    # Search recursively, top-down; stop at the first CSV instead of listing the whole tree
+    for root, _, files in os.walk(path):
+        for name in files:
+            if name.endswith('.csv'):
+                # Simple heuristic: take the first one found
+                print(f"Found CSV file: {name}")
+                return os.path.join(root, name)
 
-    # Simple heuristic: take the first one found
-    print(f"Found CSV file: {os.path.basename(csv_files[0])}")
-    return csv_files[0]
+    raise FileNotFoundError(f"No CSV file found in the downloaded path: {path}")
 
 
 def download_and_load(dataset_name: str) -> pd.DataFrame:
@@ -56,48 +73,44 @@ def download_and_load(dataset_name: str) -> pd.DataFrame:
     # Locate the CSV file within the downloaded directory structure
     csv_file_path = find_csv_in_path(download_path)
 
-    # Load the data
-    df = pd.read_csv(csv_file_path, low_memory=False)
+    # Load only the used columns, with the multithreaded PyArrow parser
+    df = pd.read_csv(csv_file_path, engine='pyarrow', usecols=DATASET_USECOLS[dataset_name])
     print(f"Loaded {len(df)} records for {dataset_name}.")
 
     return df
 
-def normalize_metric_value(val):
+def normalize_metric_series(s: pd.Series) -> pd.Series:
     """
-    Convert Instagram-style metric values to integers.
+    Convert a column of Instagram-style metric values to floats (vectorized).
     Handles: 930k, 1.7m, 12.4K, 900, 1,200, 3.2B, etc.
     Returns np.nan for invalid or empty values.
     """
-    if pd.isna(val):
-        return np.nan
-
-    # Convert to string
-    s = str(val).strip().lower()
-
-    # Remove commas
-    s = s.replace(",", "")
-
-    # Case 1: Pure numeric digits
-    if s.replace('.', '', 1).isdigit():
-        return float(s)
-
-    # Case 2: Ends with k/m/b suffix
-    multiplier = 1
-    if s.endswith("k"):
-        multiplier = 1e3
-        s = s[:-1]
-    elif s.endswith("m"):
-        multiplier = 1e6
-        s = s[:-1]
-    elif s.endswith("b"):
-        multiplier = 1e9
-        s = s[:-1]
-
-    # If the remaining part is not numeric, return NaN
-    try:
-        return float(s) * multiplier
-    except:
-        return np.nan
+    # Convert to lowercase strings without commas
+    s = s.astype(str).str.lower().str.replace(",", "", regex=False).str.strip()
+
+    # k/m/b suffix -> multiplier (1 when there is no suffix)
+    multiplier = np.where(s.str.endswith("k"), 1e3,
+                          np.where(s.str.endswith("m"), 1e6,
+                                   np.where(s.str.endswith("b"), 1e9, 1.0)))
+
+    # Strip the (single) suffix; anything left that is not numeric becomes NaN
+    s = s.where(multiplier == 1.0, s.str[:-1])
+    return pd.to_numeric(s, errors="coerce") * multiplier
+
+
+# Non-negative count columns stored as unsigned integers when they hold whole numbers
+_COUNT_COLUMNS = ['followers', 'following', 'likes', 'comments', 'Followers', 'total_posts_count']
+
+
+def _shrink_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcasts float columns to float32 and whole-number counts to the smallest unsigned type."""
+    for col in df.select_dtypes('float').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    for col in _COUNT_COLUMNS:
+        if col in df:
+            # Left as float when the column has NaNs or fractional values
+            df[col] = pd.to_numeric(df[col], downcast='unsigned', errors='coerce')
+    return df
 
 
 # --- Cleaning and Feature Engineering Functions ---
@@ -106,14 +119,15 @@ def clean_plep_data(df: pd.DataFrame) -> pd.DataFrame:
     """Performs cleaning and feature engineering on the 8k PLEP dataset."""
     print("\n--- Cleaning 8k PLEP Data ---")
 
-    # 1. Drop unnecessary columns
-    df = df.drop(columns=['shortcode', 'location', 'multiple_images'], errors='ignore')
+    # 1. Unnecessary columns (shortcode, location, multiple_images) are not loaded (see DATASET_USECOLS)
 
     # 2. Rename columns for consistency
     df = df.rename(columns={'owner_username': 'username', 'imageUrl': 'image_url'})
 
     # 3. Handle missing values
     df = df.dropna(subset=['caption', 'image_url', 'followers', 'likes', 'comments'])
+    # Arrow-backed strings: .str operations run as vectorized Arrow kernels instead of per-row Python
+    df['caption'] = df['caption'].astype('string[pyarrow]')
 
     # 4. Convert data types
     df['is_video'] = df['is_video'].astype(bool)
@@ -122,41 +136,33 @@ def clean_plep_data(df: pd.DataFrame) -> pd.DataFrame:
 
     # Data type conversion for engagement calculation
     for col in ['likes', 'comments']:
-        # Remove commas, dollar signs, or other non-numeric chars
-        df[col] = df[col].str.replace(r'[^\d.-]', '', regex=True)
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Drop thousands separators, capture the numeric portion (ignores $ and other chars),
+        # and store it as float32
+        digits = df[col].astype(str).str.replace(',', '', regex=False).str.extract(_NUM_RE, expand=False)
+        df[col] = pd.to_numeric(digits, errors='coerce', downcast='float')
 
     # 5. Feature Engineering: Create the Target Variable (Engagement Rate)
 
     # --- Conditional Engagement Rate Calculation based on Follower Tiers ---
-    # Define conditions for like and comment weighting
-    conditions = [
-        (df['followers'] >= 10000),
-        (df['followers'] >= 7500) & (df['followers'] < 10000),
-        (df['followers'] >= 5000) & (df['followers'] < 7500),
-        (df['followers'] >= 2000) & (df['followers'] < 5000),
-        (df['followers'] >= 1000) & (df['followers'] < 2000),
-    ]
-    # Define corresponding like and comment weights
-    comment_weights = [8, 7.5, 5, 0.005, 0.0005]
-    like_weights = [3, 2.5, 1.5, 0.0005, 0.00005]
-
-    # Initialize a new column for the comment weight for each row
-    df['comment_weight'] = np.select(conditions, comment_weights, default=0)  # Default=0 for followers < 1000
-    df['like_weight'] = np.select(conditions, like_weights, default=0)  # Default=0 for followers < 1000
+    # Tier lower bounds: [1000, 2000), [2000, 5000), [5000, 7500), [7500, 10000), [10000, inf)
+    follower_thresholds = np.array([1000, 2000, 5000, 7500, 10000])
+    # Like and comment weights per tier (index 0 = below 1000 followers, weight 0)
+    comment_weights = np.array([0, 0.0005, 0.005, 5, 7.5, 8])
+    like_weights = np.array([0, 0.00005, 0.0005, 1.5, 2.5, 3])
+
+    # One pass over followers: tier index per row, then gather both weights from it
+    followers = df['followers'].to_numpy()
+    tier = np.searchsorted(follower_thresholds, followers, side='right')
 
     # Calculate weighted engagement rate using the chosen weight
-    # If followers < 1000 (weight=0), the calculated ER will be 0
+    # If followers < 1000 (tier 0), the calculated ER will be 0
     df['engagement_rate'] = np.where(
-        df['followers'] >= 1000,  # Only calculate ER if account is relevant (> 1000 followers)
-        ((df['likes'] * df['like_weight'] + df['comments'] * df['comment_weight']) / df['followers']) * 100,
+        tier > 0,  # Only calculate ER if account is relevant (> 1000 followers)
+        (df['likes'].to_numpy() * like_weights[tier] + df['comments'].to_numpy() * comment_weights[tier])
+        / followers * 100,
         0.0  # Assign 0.0 for accounts with < 1000 followers (micro-accounts are not target)
     )
 
-    # Drop the temporary columns
-    df = df.drop(columns=['comment_weight'])
-    df = df.drop(columns=['like_weight'])
-
     # Clip outliers at 30% (to allow for high engagement with high comment weights)
     df['engagement_rate'] = df['engagement_rate'].clip(upper=30)
     df = df.dropna(subset=['engagement_rate'])
@@ -166,7 +172,7 @@ def clean_plep_data(df: pd.DataFrame) -> pd.DataFrame:
     df['day_of_week'] = df['created_at'].dt.dayofweek  # Monday=0, Sunday=6
 
     # 7. Basic Content Feature Engineering
-    df['caption_length'] = df['caption'].str.len()
+    df['caption_length'] = df['caption'].str.len().astype('int32')
 
     print(f"Cleaned PLEP data shape: {df.shape}")
     return df
@@ -192,11 +198,10 @@ def clean_ranking_data(df: pd.DataFrame) -> pd.DataFrame:
     # Normalize the metric values
     for col in ['Total Likes', 'Followers', 'total_posts_count', 'market_influence_score', 'account_avg_likes',
                 'engagement_rate_60d', 'New Post Avg. Likes']:
-        df[col] = df[col].apply(normalize_metric_value)
+        df[col] = normalize_metric_series(df[col])
 
 
-    # 3. Drop the original 'rank' as it's often arbitrary, and 'country' for simplicity
-    df = df.drop(columns=['Rank', 'Country Or Region'], errors='ignore')
+    # 3. The original 'rank' (often arbitrary) and 'country' are not loaded (see DATASET_USECOLS)
     df = df.dropna(subset=['market_influence_score', 'Followers'])
 
     print(f"Cleaned Ranking data shape: {df.shape}")
@@ -220,23 +225,30 @@ def process_niche_supplement_data(df: pd.DataFrame) -> pd.DataFrame:
 
 # --- Main Execution Block ---
 
-def run_ingestion_pipeline():
-    """Executes the full data ingestion, cleaning, and splitting process."""
+def run_ingestion_pipeline(export_csv: bool = False):
+    """
+    Executes the full data ingestion, cleaning, and splitting process.
+    Outputs are written as Snappy-compressed Parquet; export_csv additionally writes
+    CSV copies for external tooling.
+    """
 
     # --- Step 1: Download and Load Raw Data ---
+    # The three datasets are downloaded and parsed concurrently (network-bound downloads and
+    # the PyArrow CSV parser both release the GIL), so the step takes as long as the slowest one
     try:
-        plep_df = download_and_load("plep_data")
-        niche_df = download_and_load("niche_supplement")
-        ranking_df = download_and_load("ranking_data")
+        with ThreadPoolExecutor(max_workers=len(KAGGLE_DATASETS)) as executor:
+            futures = {name: executor.submit(download_and_load, name) for name in KAGGLE_DATASETS}
+            dfs = {name: future.result() for name, future in futures.items()}
+        plep_df, niche_df, ranking_df = dfs["plep_data"], dfs["niche_supplement"], dfs["ranking_data"]
     except Exception as e:
         print(f"\nFATAL ERROR during data download/loading. Ensure 'kagglehub' is installed and configured.")
         print(f"Error details: {e}")
         return
 
     # --- Step 2: Clean and Engineer Features ---
-    plep_df_cleaned = clean_plep_data(plep_df.copy())
+    plep_df_cleaned = _shrink_dtypes(clean_plep_data(plep_df.copy()))
     niche_df_processed = process_niche_supplement_data(niche_df.copy())
-    ranking_df_cleaned = clean_ranking_data(ranking_df.copy())
+    ranking_df_cleaned = _shrink_dtypes(clean_ranking_data(ranking_df.copy()))
 
     # --- Step 3: Split PLEP Data for Training/Testing (Core Model) ---
 
@@ -246,11 +258,11 @@ def run_ingestion_pipeline():
 
     # Stratify by engagement_rate bucket so that the model trains on a balanced distribution of low to high engagement
     # posts so it won’t be biased toward the common ranges, and it balances the outcome of prediction.
-    y_bucket = pd.qcut(
-        y.astype(float),
-        q=10,  # 10 buckets for engagement levels
-        duplicates="drop"
-    )
+    # Decile edges (duplicates dropped, as qcut does) and a plain int8 bucket id per row;
+    # side='left' keeps qcut's right-closed intervals
+    y_values = y.to_numpy(dtype=np.float64)
+    edges = np.unique(np.quantile(y_values, np.linspace(0, 1, 11)))  # 10 buckets for engagement levels
+    y_bucket = np.searchsorted(edges[1:-1], y_values, side='left').astype(np.int8)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y,
@@ -269,20 +281,22 @@ def run_ingestion_pipeline():
 
     # --- Step 4: Save Processed DataFrames ---
 
-    train_df_path = os.path.join(PROCESSED_DIR, 'plep_train_data.csv')
-    test_df_path = os.path.join(PROCESSED_DIR, 'plep_test_data.csv')
-    niche_df_path = os.path.join(PROCESSED_DIR, 'niche_supplement_data.csv')
-    ranking_df_path = os.path.join(PROCESSED_DIR, 'ranking_data.csv')
-
-    train_df.to_csv(train_df_path, index=False)
-    test_df.to_csv(test_df_path, index=False)
-    niche_df_processed.to_csv(niche_df_path, index=False)
-    ranking_df_cleaned.to_csv(ranking_df_path, index=False)
+    outputs = {
+        'plep_train_data': train_df,
+        'plep_test_data': test_df,
+        'niche_supplement_data': niche_df_processed,
+        'ranking_data': ranking_df_cleaned,
+    }
+    for name, df in outputs.items():
+        # Columnar binary: no number-to-text formatting here, no re-parsing in the readers
+        df.to_parquet(os.path.join(PROCESSED_DIR, f'{name}.parquet'), compression='snappy', index=False)
+        if export_csv:
+            df.to_csv(os.path.join(PROCESSED_DIR, f'{name}.csv'), index=False)
 
     print("\n--- Data Ingestion Pipeline Complete ---")
     print(f"All processed data saved to the '{PROCESSED_DIR}' directory.")
 
 
 if __name__ == '__main__':
-    # Execute the data pipeline when the script is run directly.
-    run_ingestion_pipeline()
\ No newline at end of file
+    # Execute the data pipeline when the script is run directly (--csv: also export CSV copies).
+    run_ingestion_pipeline(export_csv='--csv' in sys.argv[1:])
\ No newline at end of file
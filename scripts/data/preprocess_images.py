@@ -3,18 +3,32 @@ scripts/data/preprocess_images.py
 """
 import cv2
 import numpy as np
+import torch
 from PIL import Image
-from torchvision import transforms
 from typing import Tuple, Any
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba not installed: fall back to a numpy lookup table
+    njit = None
+
 # Define the standard size required by the Content Visual Agent's underlying CNN/CLIP model
 TARGET_SIZE = (224, 224)
 
+# Standard normalization for pre-trained models (ImageNet mean/std), folded into one
+# multiply-add per pixel: (v / 255 - mean) / std == v * scale + bias
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+_NORM_SCALE = (1.0 / (255.0 * IMAGENET_STD)).astype(np.float32)
+_NORM_BIAS = (-IMAGENET_MEAN / IMAGENET_STD).astype(np.float32)
+# Fallback: normalized value of every (uint8 value, channel) pair
+_NORM_LUT = np.arange(256, dtype=np.float32)[:, None] * _NORM_SCALE + _NORM_BIAS
 
-def resize_image(image_path: str, size: Tuple[int, int] = TARGET_SIZE) -> Image.Image:
+
+def resize_image_array(image_path: str, size: Tuple[int, int] = TARGET_SIZE) -> np.ndarray:
     """
-    Loads an image using OpenCV, converts color space, and resizes it using PIL.
-    This prepares the image for feature extraction in the training pipeline.
+    Loads an image using OpenCV, resizes it, and converts it to an RGB uint8 array (H, W, 3).
+    The resize runs first, so the color conversion only touches the small image.
     """
     try:
         # Load image using OpenCV (OpenCV is often faster for large batch reads)
@@ -22,16 +36,23 @@ def resize_image(image_path: str, size: Tuple[int, int] = TARGET_SIZE) -> Image.
         if img is None:
             raise FileNotFoundError(f"Image not found at path: {image_path}")
 
-        # Convert BGR (OpenCV default) to RGB (standard for PIL/PyTorch)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # Area interpolation for downscaling (size is (width, height), as with PIL)
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
 
-        # Convert to PIL Image for standard resizing
-        pil_img = Image.fromarray(img)
-        return pil_img.resize(size)
+        # Convert BGR (OpenCV default) to RGB (standard for PIL/PyTorch)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
     except Exception as e:
-        print(f"Error processing image {image_path} with OpenCV/PIL: {e}")
+        print(f"Error processing image {image_path} with OpenCV: {e}")
         # Return a black placeholder image on failure
-        return Image.fromarray(np.zeros((*size, 3), dtype=np.uint8))
+        return np.zeros((size[1], size[0], 3), dtype=np.uint8)
+
+
+def resize_image(image_path: str, size: Tuple[int, int] = TARGET_SIZE) -> Image.Image:
+    """
+    Loads and resizes an image as a PIL Image (see resize_image_array).
+    This prepares the image for feature extraction in the training pipeline.
+    """
+    return Image.fromarray(resize_image_array(image_path, size))
 
 
 def normalize_image(image: np.ndarray) -> np.ndarray:
@@ -39,18 +60,38 @@ def normalize_image(image: np.ndarray) -> np.ndarray:
     return image.astype(np.float32) / 255.0
 
 
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _normalize_fused(img_u8, scale, bias, out):
+        height, width, channels = img_u8.shape
+        for y in prange(height):
+            for x in range(width):
+                for c in range(channels):
+                    out[c, y, x] = img_u8[y, x, c] * scale[c] + bias[c]
+
+
+def normalize_imagenet(image: np.ndarray) -> np.ndarray:
+    """
+    Casts, scales to [0,1] and ImageNet-normalizes an (H, W, 3) uint8 RGB image in a
+    single pass, writing the (C, H, W) float32 layout the models expect
+    (same arithmetic as ToTensor + Normalize, without their intermediate arrays).
+    """
+    if njit is None:
+        return np.ascontiguousarray(_NORM_LUT[image, np.arange(3)].transpose(2, 0, 1))
+    height, width, channels = image.shape
+    out = np.empty((channels, height, width), dtype=np.float32)
+    _normalize_fused(np.ascontiguousarray(image), _NORM_SCALE, _NORM_BIAS, out)
+    return out
+
+
 def load_image_as_tensor(image_path: str) -> Any:
     """
     Loads the image, resizes, and converts it to a normalized PyTorch tensor (C,H,W).
     This output is directly fed into the CNN/CLIP feature extraction models.
     """
-    pil_img = resize_image(image_path)
+    # Resized RGB pixels straight from OpenCV (no PIL round trip)
+    img = resize_image_array(image_path)
 
-    # Standard normalization for pre-trained models (e.g., ImageNet mean/std)
-    transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                             std=[0.229, 0.224, 0.225])
-    ])
+    # Standard normalization for pre-trained models (ImageNet mean/std), fused into one pass
     # Returns a tensor with shape (1, C, H, W)
-    return transform(pil_img).unsqueeze(0)
\ No newline at end of file
+    return torch.from_numpy(normalize_imagenet(img)).unsqueeze(0)
\ No newline at end of file
@@ -2,34 +2,60 @@
 scripts/data/utils_data.py
 
 Common helpers used by ingestion/preprocessing scripts:
-- safe_read_csv: try multiple encodings and delimiters
+- safe_read_csv: detect encoding and delimiter, then read once
 - ensure_dirs
 - clean caption & extract hashtags
 - generate_post_id
 """
 
+import codecs
+import csv
 import os
 import pandas as pd
 import re
-import uuid
+import secrets
 from pathlib import Path
 from typing import List, Any
 
+# Patterns compiled once at import; the cleaners run once per caption
+_URL_RE = re.compile(r"http\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_HASHTAG_RE = re.compile(r"#[A-Za-z0-9_]+")
+_WEIRD_RE = re.compile(r"[^A-Za-z0-9\s\.,!?'\"]+")
+_WS_RE = re.compile(r"\s+")
+_HASHTAG_EXTRACT_RE = re.compile(r"#([A-Za-z0-9_]+)")
+_HASHTAG_EXTRACT_LOWER_RE = re.compile(r"#([a-z0-9_]+)")  # for text that is already lowercased
+
 def ensure_dirs(*dirs):
     for d in dirs:
         Path(d).mkdir(parents=True, exist_ok=True)
 
+_SNIFF_BYTES = 8192
+
+def _sniff_csv(path: str):
+    """Detect (encoding, delimiter) from the first few KB of the file."""
+    with open(path, "rb") as f:
+        head = f.read(_SNIFF_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        enc = "utf-8-sig"
+    else:
+        enc = "utf-8"
+        try:
+            # Incremental decode: a multi-byte character cut off at the end of the sample is not an error
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        except UnicodeDecodeError:
+            enc = "latin1"
+    try:
+        sep = csv.Sniffer().sniff(head.decode(enc, errors="replace"), delimiters=",\t;").delimiter
+    except csv.Error:
+        sep = ","
+    return enc, sep
+
 def safe_read_csv(path: str) -> pd.DataFrame:
-    """Try reading CSV with common options; returns empty df on failure."""
-    for enc in (None, "utf-8", "latin1"):
-        for sep in (",", "\t", ";"):
-            try:
-                return pd.read_csv(path, encoding=enc, sep=sep, low_memory=False)
-            except Exception:
-                continue
-    # last resort: pandas read_csv default (may raise)
+    """Read a CSV with its detected encoding and delimiter; returns empty df on failure."""
     try:
-        return pd.read_csv(path)
+        enc, sep = _sniff_csv(path)
+        return pd.read_csv(path, encoding=enc, sep=sep, low_memory=False)
     except Exception:
         return pd.DataFrame()
 
@@ -38,21 +64,34 @@ def clean_caption(text: Any) -> str:
     if pd.isna(text) or text is None:
         return ""
     s = str(text)
-    s = re.sub(r"http\S+", "", s)       # urls
-    s = re.sub(r"@\w+", "", s)          # mentions
-    s = re.sub(r"#[A-Za-z0-9_]+", "", s) # hashtags removed here because it is also stored
-    s = re.sub(r"[^A-Za-z0-9\s\.,!?'\"]+", " ", s)  # remove weird chars
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _URL_RE.sub("", s)       # urls
+    s = _MENTION_RE.sub("", s)   # mentions
+    s = _HASHTAG_RE.sub("", s)   # hashtags removed here because it is also stored
+    s = _WEIRD_RE.sub(" ", s)    # remove weird chars
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
+def clean_caption_series(captions: pd.Series) -> pd.Series:
+    """Vectorized clean_caption for a whole column (missing captions become "")."""
+    s = captions.fillna("").astype(str)
+    s = s.str.replace(_URL_RE, "", regex=True)
+    s = s.str.replace(_MENTION_RE, "", regex=True)
+    s = s.str.replace(_HASHTAG_RE, "", regex=True)
+    s = s.str.replace(_WEIRD_RE, " ", regex=True)
+    return s.str.replace(_WS_RE, " ", regex=True).str.strip()
+
 def extract_hashtags(text: Any) -> List[str]:
     """Extract hashtags from text; returns list of lowercased tags without #."""
     if pd.isna(text) or text is None:
         return []
     s = str(text)
-    tags = re.findall(r"#([A-Za-z0-9_]+)", s)
+    tags = _HASHTAG_EXTRACT_RE.findall(s)
     return [t.lower() for t in tags]
 
+def extract_hashtags_series(captions: pd.Series) -> pd.Series:
+    """Vectorized extract_hashtags: lowercases the whole column once, then finds all tags per row."""
+    return captions.fillna("").astype(str).str.lower().str.findall(_HASHTAG_EXTRACT_LOWER_RE)
+
 def generate_post_id(prefix: str = "p") -> str:
     """Create a stable unique post id."""
-    return f"{prefix}_{uuid.uuid4().hex[:12]}"
+    return f"{prefix}_{secrets.token_hex(6)}"  # 12 random hex chars, no UUID object
@@ -13,10 +13,14 @@ sys.path.append(PROJECT_ROOT)
 
 
 DATA_ROOT = os.path.join(PROJECT_ROOT, 'data', 'processed')
-RANKING_DATA_PATH = os.path.join(DATA_ROOT, 'ranking_data.csv')
+RANKING_DATA_PATH = os.path.join(DATA_ROOT, 'ranking_data.parquet')
+RANKING_CSV_PATH = os.path.join(DATA_ROOT, 'ranking_data.csv')  # Fallback for CSV-only exports
 
 try:
-    df = pd.read_csv(RANKING_DATA_PATH)
+    if os.path.exists(RANKING_DATA_PATH):
+        df = pd.read_parquet(RANKING_DATA_PATH)
+    else:
+        df = pd.read_csv(RANKING_CSV_PATH)
     # Top 10 influencers by score
     top10 = df.sort_values("engagement_score", ascending=False).head(10)
     top10.to_csv("../data/processed/top10_influencers.csv", index=False)
@@ -27,4 +31,4 @@ try:
     plt.savefig("../data/processed/engagement_distribution.png")
     plt.show()
 except Exception as e:
-    print(f"Error loading CSV: {e}")
\ No newline at end of file
+    print(f"Error loading ranking data: {e}")
\ No newline at end of file
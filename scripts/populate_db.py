@@ -15,12 +15,16 @@ from backend.app.services.data_ingestion_service import get_data_ingestion_servi
 from backend.app.services.firestore_service import get_firestore_service
 
 DATA_ROOT = os.path.join(PROJECT_ROOT, 'data', 'processed')
-RANKING_DATA_PATH = os.path.join(DATA_ROOT, 'ranking_data.csv')
+RANKING_DATA_PATH = os.path.join(DATA_ROOT, 'ranking_data.parquet')
+RANKING_CSV_PATH = os.path.join(DATA_ROOT, 'ranking_data.csv')  # Fallback for CSV-only exports
 
 def load_data() -> List[Dict[str, Any]]:
     print("Loading data for population...")
     try:
-        df = pd.read_csv(RANKING_DATA_PATH)
+        if os.path.exists(RANKING_DATA_PATH):
+            df = pd.read_parquet(RANKING_DATA_PATH)
+        else:
+            df = pd.read_csv(RANKING_CSV_PATH)
         # Rename cols to match schema
         df = df.rename(columns={
             'username': 'username',
@@ -37,7 +41,7 @@ def load_data() -> List[Dict[str, Any]]:
 
         return profiles
     except Exception as e:
-        print(f"Error loading CSV: {e}")
+        print(f"Error loading ranking data: {e}")
         return []
 
 async def main():
@@ -50,13 +54,16 @@ async def main():
     get_firestore_service()
 
     profiles = load_data()
-    for i, p in enumerate(profiles):
-        print(f"[{i+1}/{len(profiles)}] Ingesting {p['username']}...")
-        try:
-            # This triggers the full pipeline: Validation -> Niche Agent -> Firestore
-            await ingestion_service.process_raw_influencer_data(p)
-        except Exception as e:
-            print(f"  -> Failed: {e}")
+    print(f"Ingesting {len(profiles)} profiles...")
+    try:
+        # This triggers the full pipeline: Validation -> Niche Agent -> Firestore (batched writes).
+        # A record that fails validation or processing is skipped without aborting the others.
+        profile_ids = await ingestion_service.process_raw_influencer_data_batch(profiles)
+        for p, profile_id in zip(profiles, profile_ids):
+            if profile_id is None:
+                print(f"  -> Failed: {p['username']} did not pass validation or processing (see logs)")
+    except Exception as e:
+        print(f"  -> Failed: {e}")
 
     print("DB POPULATION COMPLETE")
 
@@ -2,25 +2,36 @@
 scripts/train_all_models.py
 """
 
+import asyncio
+import hashlib
 import os
+import queue
 import sys
+import tempfile
+import threading
 import time
 import shutil
-from typing import Dict, Any
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
+import pandas as pd
 
 # Adjust path to enable imports from backend modules
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
 sys.path.append(PROJECT_ROOT)
 
-from backend.app.ml_agents.niche_profiler_agent import NicheProfilerAgent
-from backend.app.ml_agents.content_visual_agent import ContentVisualAgent
-from backend.app.ml_agents.engagement_agent import EngagementAgent
-from backend.app.ml_agents.recommendation_agent import RecommendationAgent
-
-# Configuration paths
-MODEL_SAVE_PATH = os.path.join(PROJECT_ROOT, 'models')
-os.makedirs(MODEL_SAVE_PATH, exist_ok=True)
+# Configuration paths (built once at import)
+DATA_ROOT = Path(PROJECT_ROOT, 'data', 'processed')
+MODEL_SAVE_PATH = Path(PROJECT_ROOT, 'models')
+MODEL_SAVE_PATH.mkdir(parents=True, exist_ok=True)
+# Content-addressed artifacts: <Agent>_<sha256 of (agent, training code, params, training data)>.joblib
+ARTIFACT_CACHE_PATH = MODEL_SAVE_PATH / '.cache'
+ARTIFACT_CACHE_PATH.mkdir(exist_ok=True)
+# Machine-readable summary of the latest run (for CI/orchestrators)
+MANIFEST_PATH = MODEL_SAVE_PATH / 'manifest.json'
 
 # MAPPING: Agent Name -> The exact filename Agent class expects
 ARTIFACT_MAPPING = {
@@ -29,78 +40,326 @@ ARTIFACT_MAPPING = {
     "EngagementAgent": "engagement_predictor_model.joblib",
     "RecommendationAgent": "market_ranker_model.joblib"
 }
+# Agent Name -> module defining the Agent class. Never imported here (it pulls in the heavy ML stack,
+# which the mock trainers don't use); its source file is part of the artifact cache key
+AGENT_MODULES = {
+    "NicheProfilerAgent": "backend.app.ml_agents.niche_profiler_agent",
+    "ContentVisualAgent": "backend.app.ml_agents.content_visual_agent",
+    "EngagementAgent": "backend.app.ml_agents.engagement_agent",
+    "RecommendationAgent": "backend.app.ml_agents.recommendation_agent"
+}
+# Agent Name -> production artifact path
+ARTIFACT_PATHS = {name: MODEL_SAVE_PATH / filename for name, filename in ARTIFACT_MAPPING.items()}
+# Agent Name -> training hyperparameters (part of the artifact cache key)
+TRAINING_PARAMS: Dict[str, Dict[str, Any]] = {
+    "NicheProfilerAgent": {"epochs": 3, "learning_rate": 2e-5, "max_seq_length": 128},
+    "ContentVisualAgent": {"epochs": 5, "learning_rate": 1e-4, "image_size": 100},
+    "EngagementAgent": {"n_estimators": 300, "max_depth": 6, "learning_rate": 0.05},
+    "RecommendationAgent": {"n_estimators": 200, "max_depth": 4, "learning_rate": 0.1},
+}
+
+# (Agent name, training data file); the agents are independent,
+# so their trainings run concurrently on the event loop
+TRAINING_JOBS = (
+    ("NicheProfilerAgent", DATA_ROOT / "niche_supplement_data.csv"),
+    ("ContentVisualAgent", DATA_ROOT / "plep_train_data.csv"),
+    ("EngagementAgent", DATA_ROOT / "plep_train_data.csv"),  # PLEP
+    ("RecommendationAgent", DATA_ROOT / "ranking_data.csv"),  # Ranking
+)
+
+def _resolve_training_file(training_data_path: Path) -> Path:
+    """Returns the Parquet export of a training file when one exists, else the file itself."""
+    parquet_path = training_data_path.with_suffix('.parquet')
+    return parquet_path if parquet_path.exists() else training_data_path
+
+@lru_cache(maxsize=None)
+def _load_training_frame(training_data_path: Path) -> pd.DataFrame:
+    """
+    Loads a training file once per process; agents that train on the same file share
+    the frame (treat it as read-only). Reads the Parquet export when one exists.
+    """
+    path = _resolve_training_file(training_data_path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_csv(path, memory_map=True)
+
+@lru_cache(maxsize=None)
+def _file_digest(path: Path) -> str:
+    """Streaming SHA-256 of a file (computed once per path per run)."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def _module_source_path(module_name: str) -> Path:
+    """Source file of a project module, located without importing it."""
+    return Path(PROJECT_ROOT, *module_name.split('.')).with_suffix('.py')
+
+def _artifact_cache_path(agent_name: str, training_data_path: Path) -> Path:
+    """
+    Cache location of the artifact trained by agent_name with the current training code
+    (this script and the agent's module), its TRAINING_PARAMS and the current contents
+    of its training file; a change to any of them is a cache miss.
+    """
+    key = orjson.dumps({
+        "agent": agent_name,
+        "code": [_file_digest(Path(os.path.abspath(__file__))),
+                 _file_digest(_module_source_path(AGENT_MODULES[agent_name]))],
+        "params": TRAINING_PARAMS[agent_name],
+        "data": _file_digest(_resolve_training_file(training_data_path)),
+    }, option=orjson.OPT_SORT_KEYS)
+    return ARTIFACT_CACHE_PATH / f"{agent_name}_{hashlib.sha256(key).hexdigest()}.joblib"
+
+def _write_artifact(data: bytes, path: Path):
+    """Writes a serialized artifact to a new file with a single write call (never truncates an existing one)."""
+    with open(path, 'xb') as f:
+        f.write(data)
+        f.flush()
+        if hasattr(os, 'posix_fadvise'):
+            # Written once, read later by another process: keep it out of this run's page cache
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+def _tmp_path(path: Path) -> Path:
+    """
+    Returns a fresh, unused temporary name next to path (same directory, so it can be renamed over it).
+    The reserved file is removed again, so the caller creates a new inode there: a hard link or
+    a write never lands on a file that is still linked to a published or cached artifact.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    os.unlink(tmp_name)
+    return Path(tmp_name)
+
+def _copy_artifact(source_path: Path, copy_path: Path):
+    """
+    Copies an artifact's bytes only (no permission bits/metadata). On Linux this is an
+    in-kernel copy_file_range, which reflinks on filesystems that support it (XFS/Btrfs).
+    """
+    if hasattr(os, 'copy_file_range'):
+        with open(source_path, 'rb') as src, open(copy_path, 'wb') as dst:
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                pass  # e.g., cross-filesystem copy on older kernels: fall through to copyfile
+    shutil.copyfile(source_path, copy_path)
+
+def _link_artifact(source_path: Path, link_path: Path):
+    """Gives an artifact a second name without copying its bytes (hard link)."""
+    try:
+        os.link(source_path, link_path)
+    except OSError:
+        # Hard links unsupported (e.g., some network/Windows filesystems): copy instead
+        _copy_artifact(source_path, link_path)
+
+def _publish_artifact(versioned_path: Path, target_path: Path):
+    """
+    Points the production artifact name at a versioned artifact without copying its bytes:
+    a hard link to a temporary name, atomically renamed over the target, so readers never
+    see a partially written file.
+    """
+    tmp_path = _tmp_path(target_path)
+    _link_artifact(versioned_path, tmp_path)
+    os.replace(tmp_path, target_path)
+    # rename() is a no-op when both names already link the same file (republished unchanged)
+    tmp_path.unlink(missing_ok=True)
 
-def mock_train_model(agent_name: str, training_data_path: str) -> Dict[str, Any]:
+def _sync_dir(path: Path):
+    """Makes the links/renames in a directory durable with one fsync (POSIX only)."""
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class CheckpointWriter:
     """
-    Simulates the full training process for a given ML Agent.
+    Persists serialized artifacts on a background thread, so collecting and training
+    the next agent never waits on disk I/O. join() waits for all queued writes.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Tuple[bytes, Optional[Path], Path, Optional[Path]]]]" = queue.Queue()
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, data: bytes, versioned_path: Optional[Path], target_path: Path,
+               cache_path: Optional[Path] = None):
+        """
+        Queues an artifact write under target_path, plus its versioned name (None = no
+        versioned copy) and its entry in the artifact cache (cache_path); returns immediately.
+        """
+        self._queue.put((data, versioned_path, target_path, cache_path))
+
+    def join(self):
+        """Waits for every queued write; re-raises the first write error."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def _next_batch(self):
+        """Blocks for one job, then drains everything else already queued (None = stop)."""
+        batch = [self._queue.get()]
+        while batch[-1] is not None:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is None
+            jobs = [job for job in batch if job is not None]
+            try:
+                self._flush(jobs)
+            except Exception as e:
+                self._errors.append(e)
+            if stop:
+                return
+
+    def _flush(self, jobs):
+        """
+        Writes a batch of artifacts, publishes them, then syncs the model directory once.
+        Each artifact's bytes are written once: to a temporary name, atomically renamed to
+        the production name the Agents load, which the versioned and cache names then link to.
+        """
+        if not jobs:
+            return
+        tmp_paths = []
+        for data, _, target_path, _ in jobs:
+            tmp_paths.append(_tmp_path(target_path))
+            _write_artifact(data, tmp_paths[-1])
+        for tmp_path, (_, versioned_path, target_path, cache_path) in zip(tmp_paths, jobs):
+            os.replace(tmp_path, target_path)
+            print(f" Updated production artifact: {target_path.name}")
+            if versioned_path:
+                _link_artifact(target_path, versioned_path)
+            if cache_path:
+                _publish_artifact(target_path, cache_path)
+        _sync_dir(MODEL_SAVE_PATH)
+
+async def mock_train_model(agent_name: str, training_data_path: Path, run_id: str,
+                           force_reload: bool = False) -> Dict[str, Any]:
+    """
+    Simulates the full training process for a given ML Agent (with its TRAINING_PARAMS).
+    force_reload bypasses the shared training frame cache and reads the file again.
+    Returns the run result plus the serialized artifact ('artifact'), which the caller
+    hands to a CheckpointWriter.
     """
     print(f"--- Starting Training for {agent_name} ---")
+    load_frame = _load_training_frame.__wrapped__ if force_reload else _load_training_frame
     print(f"Loading data from: {training_data_path}...")
-    time.sleep(1.0) # Simulate time taken to load data
+    # Blocking file read runs on a worker thread, so other agents keep training meanwhile
+    training_frame = await asyncio.to_thread(load_frame, training_data_path)
+    print(f"Loaded {len(training_frame)} training rows.")
 
-    # Generate a timestamped version first (good practice for versioning)
-    timestamp = time.strftime('%Y%m%d%H%M%S')
-    versioned_filename = f"{agent_name}_v{timestamp}.joblib"
-    versioned_path = os.path.join(MODEL_SAVE_PATH, versioned_filename)
+    # Versioned by the run id shared by all agents in this run (good practice for versioning)
+    versioned_path = MODEL_SAVE_PATH / f"{agent_name}_v{run_id}.joblib"
+
+    print(f"Training with params: {TRAINING_PARAMS[agent_name]}")
 
     # Simulate saving the model artifact
     print(f"Training complete. Model metrics: {{'loss': 0.05, 'accuracy': 0.92}}")
-    with open(versioned_path, 'w') as f:
-        f.write(f"Mock artifact for {agent_name} trained on {time.ctime()}")
-
-    # Create the 'Latest' copy that the Agents will actually load
-    target_filename = ARTIFACT_MAPPING.get(agent_name)
-    if target_filename:
-        target_path = os.path.join(MODEL_SAVE_PATH, target_filename)
-        shutil.copy(versioned_path, target_path)
-        print(f" Updated production artifact: {target_filename}")
+    artifact = f"Mock artifact for {agent_name} trained on {time.ctime()}".encode()
 
     return {
         "agent_name": agent_name,
         "status": "SUCCESS",
+        "versioned_path": versioned_path,
+        "model_path": ARTIFACT_PATHS[agent_name],
+        "params": TRAINING_PARAMS[agent_name],
+        "timestamp": time.time(),
+        "artifact": artifact
+    }
+
+def _reuse_cached_artifact(agent_name: str, cache_path: Path) -> Dict[str, Any]:
+    """Publishes a previously trained artifact (unchanged training code, params and data) without retraining."""
+    print(f"--- Skipping Training for {agent_name}: training code, params and data unchanged ---")
+    target_path = ARTIFACT_PATHS[agent_name]
+    _publish_artifact(cache_path, target_path)
+    print(f" Updated production artifact: {target_path.name} (cached)")
+    return {
+        "agent_name": agent_name,
+        "status": "CACHED",
+        "versioned_path": cache_path,
         "model_path": target_path,
+        "params": TRAINING_PARAMS[agent_name],
         "timestamp": time.time()
     }
 
-def main():
+async def _amain(force_reload: bool = False, versioning: bool = True):
     """Orchestrates the training of all machine learning models."""
-    print("==============================================")
-    print("InfluencerSphere: Full Model Training Run")
-    print("==============================================")
-
-    DATA_ROOT = os.path.join(PROJECT_ROOT, 'data', 'processed')
-
-    results = []
-
-    # 1. Niche Profiler Agent
-    results.append(mock_train_model(
-        "NicheProfilerAgent",
-        os.path.join(DATA_ROOT, 'niche_supplement_data.csv')
-    ))
-
-    # 2. Content Visual Agent
-    results.append(mock_train_model(
-        "ContentVisualAgent",
-        os.path.join(DATA_ROOT, 'plep_train_data.csv')
-    ))
-
-    # 3. Engagement Agent (PLEP)
-    results.append(mock_train_model(
-        "EngagementAgent",
-        os.path.join(DATA_ROOT, 'plep_train_data.csv')
-    ))
-
-    # 4. Recommendation Agent (Ranking)
-    results.append(mock_train_model(
-        "RecommendationAgent",
-        os.path.join(DATA_ROOT, 'ranking_data.csv')
-    ))
-
-    print("\n==============================================")
-    print("ALL MODEL TRAINING COMPLETE")
-    print("==============================================")
-    for res in results:
-        print(f"- {res['agent_name']}: Ready at {os.path.basename(res['model_path'])}")
+    sys.stdout.write(
+        "==============================================\n"
+        "InfluencerSphere: Full Model Training Run\n"
+        "==============================================\n"
+    )
+
+    # One id for the whole run: timestamp plus pid, so concurrent runs never share filenames
+    run_id = f"{time.strftime('%Y%m%d%H%M%S')}_{os.getpid()}"
+
+    # Content-addressed skip: an agent whose training code, params and training file are unchanged
+    # since an earlier run reuses that run's artifact instead of retraining (unless force_reload)
+    results_by_index: Dict[int, Dict[str, Any]] = {}
+    pending: List[Tuple[int, Tuple[str, Path], Path]] = []  # (index, job, cache_path) to train
+    for index, job in enumerate(TRAINING_JOBS):
+        agent_name, training_data_path = job
+        cache_path = _artifact_cache_path(agent_name, training_data_path)
+        if not force_reload and cache_path.exists():
+            results_by_index[index] = _reuse_cached_artifact(agent_name, cache_path)
+        else:
+            pending.append((index, job, cache_path))
+
+    # Load each distinct training file once (concurrently), so agents sharing a
+    # file (ContentVisualAgent/EngagementAgent) reuse the cached frame
+    if not force_reload:
+        await asyncio.gather(*(
+            asyncio.to_thread(_load_training_frame, training_data_path)
+            for training_data_path in dict.fromkeys(job[1] for _, job, _ in pending)
+        ))
+
+    # Train the remaining agents concurrently;
+    # artifacts are persisted in the background as soon as each one finishes
+    writer = CheckpointWriter()
+
+    async def train_and_persist(index: int, job: Tuple[str, Path], cache_path: Path):
+        agent_name, training_data_path = job
+        result = await mock_train_model(agent_name, training_data_path, run_id, force_reload)
+        if not versioning:
+            result["versioned_path"] = None
+        writer.submit(result.pop("artifact"), result["versioned_path"], result["model_path"], cache_path)
+        results_by_index[index] = result
+
+    await asyncio.gather(*(train_and_persist(*entry) for entry in pending))
+    await asyncio.to_thread(writer.join)
+    results = [results_by_index[index] for index in range(len(TRAINING_JOBS))]
+
+    # Run manifest: one serialize + one write, atomically replacing the previous run's
+    manifest = orjson.dumps({"run_id": run_id, "artifacts": results}, default=str, option=orjson.OPT_INDENT_2)
+    manifest_tmp_path = _tmp_path(MANIFEST_PATH)
+    _write_artifact(manifest, manifest_tmp_path)
+    os.replace(manifest_tmp_path, MANIFEST_PATH)
+
+    sys.stdout.write(
+        "\n==============================================\n"
+        "ALL MODEL TRAINING COMPLETE\n"
+        "==============================================\n"
+        f"manifest: {MANIFEST_PATH}\n"
+    )
+
+def main(force_reload: bool = False, versioning: bool = True):
+    asyncio.run(_amain(force_reload, versioning))
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # --force-reload: retrain every agent (no cached artifacts) and let each read its training file itself
+    # --no-versioning: only update the production artifacts (no <Agent>_v<run_id> names)
+    main(force_reload='--force-reload' in sys.argv[1:], versioning='--no-versioning' not in sys.argv[1:])
\ No newline at end of file